@@ -0,0 +1,89 @@
+import sys
+import argparse
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from csci361.analysis import ngrams, substitution
+
+# Recovers the key of a monoalphabetic substitution ciphertext (such as Ctext-1) by
+# quadgram hill-climbing, after trying keyword alphabets built the way Task 2 builds them
+
+def readText(filename:str) -> str:
+    try:
+        with open(filename, 'r', encoding='utf-8', errors='ignore') as file:
+            return file.read()
+    except FileNotFoundError:
+        print(f'Error: File: {filename} not found', file=sys.stderr)
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied reading file '{filename}'.", file=sys.stderr)
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recover the key of a keyword/monoalphabetic substitution ciphertext",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+        Examples:
+        python crack.py CSCI361-DataForA1-092/Ctext-1
+        python crack.py secret.txt --corpus book.txt --table english.npy --wordlist words.txt -o plain.txt
+        """
+    )
+    parser.add_argument('ciphertext', help='Ciphertext file')
+    parser.add_argument('-o', '--output', help='Write the recovered plaintext to this file')
+    parser.add_argument('--corpus', help='English training text for the quadgram table (default: Python reference prose)')
+    parser.add_argument('--table', help='Quadgram table (.npy); built from the corpus and saved here if missing')
+    parser.add_argument('--wordlist', help='Keyword candidates, whitespace separated (default: words of the corpus)')
+    parser.add_argument('--restarts', type=int, default=8, help='Hill-climbing restarts (default 8)')
+    parser.add_argument('--workers', type=int, default=None, help='Processes for the restarts (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+    args = parser.parse_args()
+
+    if args.restarts <= 0:
+        print("Error: Number of restarts must be positive.", file=sys.stderr)
+        sys.exit(1)
+
+    cipherText = readText(args.ciphertext)
+    codes = ngrams.letterCodes(cipherText)
+    if len(codes) < 4:
+        print("Error: Ciphertext needs at least four letters.", file=sys.stderr)
+        sys.exit(1)
+
+    startTime = time.perf_counter()
+    try:
+        table = ngrams.getTable(substitution.N, args.corpus, args.table)
+    except (OSError, ValueError) as e:
+        print(f"Error loading quadgram statistics: {e}", file=sys.stderr)
+        sys.exit(1)
+    wordSource = readText(args.wordlist) if args.wordlist else (readText(args.corpus) if args.corpus else ngrams.defaultCorpus())
+    keywords = substitution.keywordCandidates(wordSource)
+
+    coincidence = ngrams.indexOfCoincidence(codes)
+    if coincidence < 0.05:
+        print(f"Warning: index of coincidence {coincidence:.3f} suggests a polyalphabetic cipher; "
+              "a substitution key is unlikely to fit.", file=sys.stderr)
+
+    result = substitution.crack(cipherText, table, args.restarts, args.workers, args.seed, keywords)
+    elapsed = time.perf_counter() - startTime
+
+    print(f"Score: {result.score:.2f} (quadgram log10, {len(codes)} letters, {elapsed:.3f} seconds)")
+    print("Cipher: " + ''.join(result.decipherKey))
+    print("Plain:  " + ''.join(result.decipherKey.values()))
+    if result.keyword:
+        print(f"Keyword: {result.keyword}")
+
+    if args.output:
+        try:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(result.plainText)
+        except OSError as e:
+            print(f"Error writing to file '{args.output}': {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f'Output written to {args.output}')
+    else:
+        print()
+        print(result.plainText)
+
+if __name__ == "__main__":
+    main()
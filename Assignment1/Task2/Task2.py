@@ -1,25 +1,22 @@
 import sys
 import argparse
 import os
+import time
+from contextlib import contextmanager
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from csci361 import batch, fileio, stats
+# The cipher lives in the library; names are re-exported so existing imports of Task2 keep working
+from csci361.ciphers.substitution import (
+    DEFAULT_CHUNK_SIZE, EXTRA_LETTERS, CompiledKeyword, KeywordCipher, compileKeyword, copyTransformed,
+    decryptMessage, encryptMessage, generateByteTable, generateCipherKey, generateDecipherKey,
+    generateTranslationTable, removeDuplicateCharacters, substituteCharacter, translateFile,
+    translateMessage, validateKeyword,
+)
 
 # Assignment 1 Task 2
 
-#region Common Functions
-def removeDuplicateCharacters(keyword:str) -> str:
-    seenChars = set()
-    result = []
-    for char in keyword.upper():
-        if char not in seenChars and char.isalpha():
-            seenChars.add(char)
-            result.append(char)
-    return ''.join(result)
-
-def validateKeyword(keyword:str) -> str:
-    if not keyword:
-        return False
-    return all(char.isalpha() for char in keyword)
-#endregion
-
 #region File manipulation functions
 def readFile(filename:str) -> str:
     try:
@@ -49,53 +46,56 @@ def writeFile(filename:str, content:str) -> None:
     except Exception as e:
         print(f"Error writing to file '{filename}': {e}", file=sys.stderr)
         sys.exit(1)
-#endregion
 
-#region Encryption and Decryption functions
-def generateCipherKey(keyword:str) -> dict[str, str]:
-    cleanedKeyword = removeDuplicateCharacters(keyword)
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+def openInput(filename:str):
+    # '-' reads from stdin so the script can sit in a pipe
+    if filename == '-':
+        sys.stdin.reconfigure(encoding='utf-8')
+        return sys.stdin
+    return open(filename, 'r', encoding='utf-8')
+
+@contextmanager
+def openOutput(filename:str):
+    # A real path is written to a temp file and renamed into place at the end,
+    # so the output can be the input file and a failed run leaves no partial file
+    if filename == '-':
+        sys.stdout.reconfigure(encoding='utf-8')
+        yield sys.stdout
+        return
+    with fileio.atomicOutput(filename) as (fd, tempPath):
+        with os.fdopen(fd, 'w', encoding='utf-8') as destination:
+            yield destination
+
+def streamFile(inputFile:str, outputFile:str, transform, chunkSize:int = DEFAULT_CHUNK_SIZE) -> int:
+    # Reads, transforms and writes one chunk at a time so memory use does not grow with the file.
+    # Substitution works per character, so chunks can be split anywhere.
+    try:
+        source = openInput(inputFile)
+    except FileNotFoundError:
+        print(f'Error: File: {inputFile} not found', file=sys.stderr)
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied reading file '{inputFile}'.", file=sys.stderr)
+        sys.exit(1)
 
-    remainingChars = []
-    for char in reversed(alphabet):
-        if char not in cleanedKeyword:
-            remainingChars.append(char)
-    
-    cipherAlphabet = cleanedKeyword + ''.join(remainingChars)
-    cipherKey = {}
-    for i, char in enumerate(alphabet):
-        cipherKey[char] = cipherAlphabet[i]
-    
-    return cipherKey
-
-def generateDecipherKey(cipherKey: dict[str, str]) -> dict[str, str]:
-    return {v: k for k, v in cipherKey.items()}
-
-def encryptMessage(message: str, cipherKey: dict[str, str]) -> str:
-    encrypted = []
-    for char in message:
-        if char.upper() in cipherKey:
-            #Preserve case
-            if char.isupper():
-                encrypted.append(cipherKey[char.upper()])
-            else:
-                encrypted.append(cipherKey[char.upper()].lower())
-        else:
-            #Keep non alphabethic characters
-            encrypted.append(char)
-    return ''.join(encrypted)
-
-def decryptMessage(cipherText:str, decipherKey: dict[str, str]) -> str:
-    decrypted = []
-    for char in cipherText:
-        if char.upper() in decipherKey:
-            if char.isupper():
-                decrypted.append(decipherKey[char.upper()])
-            else:
-                decrypted.append(decipherKey[char.upper()].lower())
-        else:
-            decrypted.append(char)
-    return ''.join(decrypted)
+    try:
+        with openOutput(outputFile) as destination:
+            bytesProcessed = copyTransformed(source, destination, transform, chunkSize)
+    except UnicodeDecodeError:
+        print(f"Error: Unable to decode file '{inputFile}'. Please ensure it's a text file.", file=sys.stderr)
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied writing to file '{outputFile}'.", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    return bytesProcessed
+
+def reportThroughput(bytesProcessed:int, elapsed:float) -> None:
+    rate = bytesProcessed / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {bytesProcessed} bytes in {elapsed:.3f} seconds ({rate / 1024 / 1024:.2f} MB/s)", file=sys.stderr)
 #endregion
 
 def main():
@@ -110,6 +110,12 @@ def main():
         
         # Decrypt a message
         python cipher.py -k STRAWBERRY -d encrypted.txt -o decrypted.txt
+
+        # Stream a large file through a pipe
+        cat big.log | python cipher.py -k STRAWBERRY -e - -o - --stream > big.enc
+
+        # Encrypt every file in a directory (or a glob, or a manifest of input/output pairs)
+        python cipher.py -k STRAWBERRY -e logs/ --batch -o encrypted_logs/
         """
     )
 
@@ -118,28 +124,93 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('-e', '--encrypt', metavar='INPUT_FILE', help='Encrypt the specified file.')
     group.add_argument('-d', '--decrypt', metavar='INPUT_FILE', help='Decrypt the specified file')
-    parser.add_argument('-o', '--output', required=True, help='Output file for the result.')
+    parser.add_argument('-o', '--output', help="Output file for the result. Use '-' for stdout. "
+                        "In batch mode, the output directory (not needed for a manifest).")
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help="Process the input in fixed-size chunks. Implied when input or output is '-'.")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Characters per chunk in streaming mode (default {DEFAULT_CHUNK_SIZE}).')
+    parser.add_argument('-b', '--batch', action='store_true',
+                        help='Treat INPUT_FILE as a directory, a glob pattern or a manifest file of "input<TAB>output" lines.')
+    parser.add_argument('--workers', type=int, default=None, help='Batch pool size (default: CPU count).')
+    parser.add_argument('--processes', action='store_true', help='Use a process pool instead of threads in batch mode.')
+    parser.add_argument('--stats', nargs='?', const='-', metavar='FILE',
+                        help='Write phase timings and counters as JSON to FILE, or to stderr when no FILE is given.')
+    parser.add_argument('--stats-memory', action='store_true',
+                        help='Also trace the peak Python allocation with tracemalloc (slower; implies --stats).')
 
     args = parser.parse_args()
 
+    if args.stats or args.stats_memory:
+        stats.enable(args.stats or '-', args.stats_memory)
+
+    if args.output is None and not args.batch:
+        parser.error("the following arguments are required: -o/--output")
+
     if not validateKeyword(args.keyword):
         print("Error: Keyword must contain only alphabetic characters.", file=sys.stderr)
         sys.exit(1)
     
-    cipherKey = generateCipherKey(args.keyword)
+    if args.chunk_size <= 0:
+        print("Error: Chunk size must be a positive number.", file=sys.stderr)
+        sys.exit(1)
+
+    with stats.phase('keySetup'):
+        compiledKey = compileKeyword(args.keyword)
+    inputFile = args.encrypt or args.decrypt
+
+    if args.batch:
+        try:
+            jobs = batch.collectJobs(inputFile, args.output)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        table = compiledKey.encryptTable if args.encrypt else compiledKey.decryptTable
+        action = "Encrypting" if args.encrypt else "Decrypting"
+        print(f"{action} {len(jobs)} file(s) with keyword '{args.keyword}'")
+        with stats.phase('batch'):
+            result = batch.runBatch(jobs, partial(translateFile, table, chunkSize=args.chunk_size),
+                                    args.workers, args.processes)
+        stats.count('files', result.files)
+        batch.printSummary(result)
+        sys.exit(1 if result.failures else 0)
+
+    streaming = args.stream or inputFile == '-' or args.output == '-'
+    # Keep stdout clean for the ciphertext when it is being piped
+    status = sys.stderr if args.output == '-' else sys.stdout
 
     try:
-        if args.encrypt:
+        if streaming:
+            if args.encrypt:
+                print(f"Encrypting '{inputFile}' with keyword '{args.keyword}'", file=status)
+                table = compiledKey.encryptTable
+            else:
+                print(f"Decrypting '{inputFile}' with keyword '{args.keyword}'", file=status)
+                table = compiledKey.decryptTable
+            transform = lambda chunk: translateMessage(chunk, table)
+            startTime = time.perf_counter()
+            bytesProcessed = streamFile(inputFile, args.output, transform, args.chunk_size)
+            reportThroughput(bytesProcessed, time.perf_counter() - startTime)
+            if args.output != '-':
+                print(f'Output written to {args.output}')
+        elif args.encrypt:
             print(f"Encrypting '{args.encrypt}' with keyword '{args.keyword}'")
-            plainText = readFile(args.encrypt)
-            cipherText = encryptMessage(plainText, cipherKey)
-            writeFile(args.output, cipherText)
+            with stats.phase('read'):
+                plainText = readFile(args.encrypt)
+            with stats.phase('transform'):
+                cipherText = translateMessage(plainText, compiledKey.encryptTable)
+            stats.count('characters', len(plainText))
+            with stats.phase('write'):
+                writeFile(args.output, cipherText)
         elif args.decrypt:
             print(f"Decrypting '{args.decrypt} with keyword '{args.keyword}''")
-            cipherText = readFile(args.decrypt)
-            decipherKey = generateDecipherKey(cipherKey)
-            plainText = decryptMessage(cipherText, decipherKey)
-            writeFile(args.output, plainText)
+            with stats.phase('read'):
+                cipherText = readFile(args.decrypt)
+            with stats.phase('transform'):
+                plainText = translateMessage(cipherText, compiledKey.decryptTable)
+            stats.count('characters', len(cipherText))
+            with stats.phase('write'):
+                writeFile(args.output, plainText)
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,86 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from kamasutra import createCipherMapping, encryption, readKeyfile
+
+# Compares the original per-character write loop with the buffered, atomic pipeline
+
+SAMPLE = "The quick brown fox jumps over the lazy dog. Kama-Sutra cipher benchmark line!\n"
+
+def legacyEncryption(inputFile, outputFile, key):
+    # The I/O path kamasutra.encryption used before: one write call per character
+    with open(inputFile, 'r') as in_file:
+        text = in_file.read()
+
+    with open(outputFile, 'w') as out_file:
+        cipherMapping = createCipherMapping(key)
+
+        for char in text:
+            if char == 'f' or char == 'F' or char == 'u' or char == 'U':
+                out_file.write(char)
+            elif char.islower():
+                out_file.write(cipherMapping.get(char, char))
+            elif char.isupper():
+                lowerChar = char.lower()
+                mappedChar = cipherMapping.get(lowerChar, lowerChar)
+                out_file.write(mappedChar.upper())
+            else:
+                out_file.write(char)
+
+def createInput(filename, sizeMB):
+    target = int(sizeMB * 1024 * 1024)
+    block = SAMPLE * (1024 * 1024 // len(SAMPLE))
+    with open(filename, 'w') as f:
+        written = 0
+        while written < target:
+            piece = block[:target - written]
+            f.write(piece)
+            written += len(piece)
+
+def timeRun(function, *args):
+    startTime = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - startTime
+
+def quietly(function, *args):
+    # encryption() prints a status line per call, which would clutter the table
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        function(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kamasutra.py file I/O paths")
+    parser.add_argument('-k', '--keyfile', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyfile.txt'))
+    parser.add_argument('-s', '--sizes', default='100,1024', help='Comma separated input sizes in MB (default 100,1024)')
+    parser.add_argument('--skip-legacy', action='store_true', help='Do not run the per-character path (slow on 1 GB)')
+    args = parser.parse_args()
+
+    key = readKeyfile(args.keyfile)
+    sizes = [float(size) for size in args.sizes.split(',')]
+
+    print(f"{'Size (MB)':>10} {'Path':>10} {'Time (s)':>10} {'MB/s':>10}")
+    with tempfile.TemporaryDirectory() as workDir:
+        inputFile = os.path.join(workDir, 'input.txt')
+        outputFile = os.path.join(workDir, 'output.txt')
+        for sizeMB in sizes:
+            createInput(inputFile, sizeMB)
+            runs = [
+                ('buffered', lambda: quietly(encryption, inputFile, outputFile, key)),
+                ('mmap', lambda: quietly(encryption, inputFile, outputFile, key, True)),
+            ]
+            if not args.skip_legacy:
+                runs.insert(0, ('legacy', lambda: legacyEncryption(inputFile, outputFile, key)))
+
+            for name, run in runs:
+                elapsed = timeRun(run)
+                print(f"{sizeMB:>10g} {name:>10} {elapsed:>10.3f} {sizeMB / elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,21 @@
 import sys
 import os
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from csci361 import batch, stats
+from csci361.ciphers import kamasutra as library
+# The cipher lives in the library; names are re-exported so existing imports keep working
+from csci361.ciphers.kamasutra import (
+    BLOCK_SIZE, EXTRA_LETTERS, CompiledKey, KamaSutraCipher, compileKey, createByteTable, createCipherMapping,
+    createTranslationTable, mapCharacter, toCompiledKey, transformBlocks, transformFile, transformMapped,
+    transformPath,
+)
 
 def generateKeypair(keyfile):
     # Generate a keyfile with the default alphabet
     try:
-        with open(keyfile,'w') as f:
-            f.write("abcdefghijklmnopqrstuvwxyz\n")
+        library.writeKeyfile(keyfile)
         print(f"Keyfile has been generated. {keyfile}")
     except IOError as e:
         print(f"Error: Cannot create keyfile {keyfile}. {e}")
@@ -14,104 +24,146 @@ def generateKeypair(keyfile):
 def readKeyfile(keyfile):
     # Read the key from the keyfile
     try:
-        with open(keyfile, 'r') as f:
-            key = f.readline().strip()
-        return key
+        return library.readKeyfile(keyfile)
     except IOError as e:
         print(f"Error: Cannot open keyfile {keyfile}. {e}")
         sys.exit(1)
 
-def createCipherMapping(key):
-    cipherMap = {}
-    keyLength = len(key)
-    
-    for i in range(keyLength // 2):
-        first = key[i].lower()
-        second = key[keyLength - 1 - i].lower()
-        
-        if 'a' <= first <= 'z' and 'a' <= second <= 'z':
-            cipherMap[first] = second
-            cipherMap[second] = first
-    
-    # Handle middle character for odd-length keys (maps to itself)
-    if keyLength % 2 == 1:
-        middle_char = key[keyLength // 2].lower()
-        if 'a' <= middle_char <= 'z':
-            cipherMap[middle_char] = middle_char
-
-    return cipherMap
+def loadKeyfile(keyfile):
+    try:
+        with stats.phase('keySetup'):
+            return library.loadKeyfile(keyfile)
+    except IOError as e:
+        print(f"Error: Cannot open keyfile {keyfile}. {e}")
+        sys.exit(1)
 
-def encryption(inputFile, outputFile, key):
+def encryption(inputFile, outputFile, key, useMmap=False):
     try:
-        with open(inputFile, 'r') as in_file:
-            text = in_file.read()
+        in_file = open(inputFile, 'rb' if useMmap else 'r')
     except IOError as e:
         print(f"Error: Cannot open input file {inputFile}. {e}")
         sys.exit(1)
-    
-    try:
-        with open(outputFile, 'w') as out_file:
-            cipherMapping = createCipherMapping(key)
-
-            for char in text:
-                if char == 'f' or char == 'F' or char == 'u' or char == 'U':
-                    out_file.write(char)
-                elif char.islower():
-                    out_file.write(cipherMapping.get(char, char))
-                elif char.isupper():
-                    lowerChar = char.lower()
-                    mappedChar = cipherMapping.get(lowerChar, lowerChar)
-                    out_file.write(mappedChar.upper())
-                else:
-                    out_file.write(char)
+
+    with in_file:
+        try:
+            transformFile(in_file, outputFile, toCompiledKey(key), useMmap)
             print(f"Encryption complete: {inputFile} -> {outputFile}")
+        except IOError as e:
+            print(f"Error: Cannot create output file {outputFile} - {e}", file=sys.stderr)
+            sys.exit(1)
+
+def decryption(inputFile, outputFile, key, useMmap=False):
+    try:
+        in_file = open(inputFile, 'rb' if useMmap else 'r')
     except IOError as e:
-        print(f"Error: Cannot create output file {outputFile} - {e}", file=sys.stderr)
+        print(f"Error: Cannot open input file {inputFile}. {e}")
+        sys.exit(1)
+
+    with in_file:
+        try:
+            transformFile(in_file, outputFile, toCompiledKey(key), useMmap)
+            print(f"Decryption complete: {inputFile} -> {outputFile}")
+        except IOError as e:
+            print(f"Error: Cannot create output file {outputFile} - {e}", file=sys.stderr)
+            sys.exit(1)
+
+def batchText(keyfile, source, outputDir=None, useMmap=False, workers=None, useProcesses=False):
+    # The pairing is its own inverse, so one batch mode serves encryption and decryption
+    compiledKey = loadKeyfile(keyfile)
+    try:
+        jobs = batch.collectJobs(source, outputDir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    print(f"Processing {len(jobs)} file(s) with keyfile {keyfile}")
+    with stats.phase('batch'):
+        result = batch.runBatch(jobs, partial(transformPath, compiledKey, useMmap), workers, useProcesses)
+    stats.count('files', result.files)
+    batch.printSummary(result)
+    return result
 
-def decryption(inputFile, outputFile, key):
+def readBytes(filename):
     try:
-        with open(inputFile, 'r') as in_file:
-            text = in_file.read()
+        with open(filename, 'rb') as f:
+            return f.read()
     except IOError as e:
-        print(f"Error: Cannot open input file {inputFile}. {e}")
+        print(f"Error: Cannot open input file {filename}. {e}")
         sys.exit(1)
-    
+
+def saveRecoveredKey(keyfile, partners):
+    from csci361.analysis import kamasutra as analysis
     try:
-        with open(outputFile, 'w') as out_file:
-            cipherMapping = createCipherMapping(key)
-
-            for char in text:
-                if char == 'f' or char == 'F' or char == 'u' or char == 'U':
-                    out_file.write(char)
-                elif char.islower():
-                    out_file.write(cipherMapping.get(char, char))
-                elif char.isupper():
-                    lowerChar = char.lower()
-                    mappedChar = cipherMapping.get(lowerChar, lowerChar)
-                    out_file.write(mappedChar.upper())
-                else:
-                    out_file.write(char)
-            print(f"Decryption complete: {inputFile} -> {outputFile}")
+        key = analysis.writeRecoveredKey(keyfile, partners)
     except IOError as e:
-        print(f"Error: Cannot create output file {outputFile} - {e}", file=sys.stderr)
+        print(f"Error: Cannot create keyfile {keyfile}. {e}")
         sys.exit(1)
+    print(f"Recovered key {key} written to {keyfile}")
+
+def recoverFromPlaintext(keyfile, plainTextFile, cipherTextFile):
+    # Known plaintext: the pairing is read straight off the aligned files
+    from csci361.analysis import kamasutra as analysis
+    with stats.phase('read'):
+        plainText, cipherText = readBytes(plainTextFile), readBytes(cipherTextFile)
+    try:
+        with stats.phase('recover'):
+            result = analysis.knownPlaintext(plainText, cipherText)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if result.conflicts:
+        print(f"Warning: letters seen with more than one partner: {' '.join(result.conflicts)}", file=sys.stderr)
+    if result.unseen:
+        print(f"Letters not in the texts (paired arbitrarily): {result.unseen}")
+    saveRecoveredKey(keyfile, result.partners)
+
+def recoverFromCiphertext(keyfile, cipherTextFile, workers=None):
+    # Ciphertext only: bigram hill-climbing over pairings, restarts spread across processes
+    from csci361.analysis import kamasutra as analysis
+    with stats.phase('read'):
+        cipherText = readBytes(cipherTextFile)
+    with stats.phase('recover'):
+        result = analysis.recoverKey(cipherText, workers=workers)
+    print(f"Bigram score: {result.score:.2f}")
+    saveRecoveredKey(keyfile, result.partners)
 
-def encryptText(keyfile, plainTextFile, cipherTextFile):
-    key = readKeyfile(keyfile)
-    encryption(plainTextFile, cipherTextFile, key)
-def decryptText(keyfile, cipherTextFile, plainTextFile):
-    key = readKeyfile(keyfile)
-    decryption(cipherTextFile, plainTextFile, key)
+def encryptText(keyfile, plainTextFile, cipherTextFile, useMmap=False):
+    encryption(plainTextFile, cipherTextFile, loadKeyfile(keyfile), useMmap)
+def decryptText(keyfile, cipherTextFile, plainTextFile, useMmap=False):
+    decryption(cipherTextFile, plainTextFile, loadKeyfile(keyfile), useMmap)
 
 def main():
+    # --stats[=FILE] and --stats-memory can go anywhere; the JSON is written on exit
+    statsOutput, traceMemory = stats.takeFlags(sys.argv)
+    if statsOutput:
+        stats.enable(statsOutput, traceMemory)
+    # --mmap can follow -e/-d to memory-map the input instead of reading it
+    useMmap = '--mmap' in sys.argv[1:]
+    if useMmap:
+        sys.argv.remove('--mmap')
+    useProcesses = '--processes' in sys.argv[1:]
+    if useProcesses:
+        sys.argv.remove('--processes')
+    workers = None
+    if '--workers' in sys.argv[1:]:
+        index = sys.argv.index('--workers')
+        try:
+            workers = int(sys.argv[index + 1])
+        except (IndexError, ValueError):
+            print("Error: --workers requires a number", file=sys.stderr)
+            sys.exit(1)
+        del sys.argv[index:index + 2]
+
     if len(sys.argv) < 3:
         print("Please include all the required arguments to run the program.")
         program_name = sys.argv[0]
         print("Usage:")
         print(f"  {program_name} -k <keyfile.txt>")
-        print(f"  {program_name} -e <keyfile.txt> <plaintext.txt> <ciphertext.txt>")
-        print(f"  {program_name} -d <keyfile.txt> <ciphertext.txt> <plaintext.txt>")
+        print(f"  {program_name} -e <keyfile.txt> <plaintext.txt> <ciphertext.txt> [--mmap]")
+        print(f"  {program_name} -d <keyfile.txt> <ciphertext.txt> <plaintext.txt> [--mmap]")
+        print(f"  {program_name} -b <keyfile.txt> <directory|glob|manifest> [<output_dir>] [--workers N] [--processes] [--mmap]")
+        print(f"  {program_name} -r <keyfile.txt> <plaintext.txt> <ciphertext.txt>")
+        print(f"  {program_name} -c <keyfile.txt> <ciphertext.txt> [--workers N]")
+        print("  Any command also takes --stats[=FILE] and --stats-memory to report timings as JSON")
         sys.exit(1)
     
     option = sys.argv[1]
@@ -126,14 +178,35 @@ def main():
         if len(sys.argv) != 5:
             print(f"Error: -e option requires keyfile, plaintext file and ciphertext file")
             sys.exit(1)
-        encryptText(sys.argv[2], sys.argv[3], sys.argv[4])
+        encryptText(sys.argv[2], sys.argv[3], sys.argv[4], useMmap)
 
     elif option == "-d":
         if len(sys.argv) != 5:
             print("Error: -d option requires keyfile, ciphertext file, and plaintext file", file=sys.stderr)
             sys.exit(1)
-        decryptText(sys.argv[2], sys.argv[3], sys.argv[4])
+        decryptText(sys.argv[2], sys.argv[3], sys.argv[4], useMmap)
     
+    elif option == "-b":
+        if len(sys.argv) not in (4, 5):
+            print("Error: -b option requires keyfile, a directory, glob or manifest, and an output directory", file=sys.stderr)
+            sys.exit(1)
+        outputDir = sys.argv[4] if len(sys.argv) == 5 else None
+        result = batchText(sys.argv[2], sys.argv[3], outputDir, useMmap, workers, useProcesses)
+        if result.failures:
+            sys.exit(1)
+
+    elif option == "-r":
+        if len(sys.argv) != 5:
+            print("Error: -r option requires the keyfile to write, a plaintext file and its ciphertext file", file=sys.stderr)
+            sys.exit(1)
+        recoverFromPlaintext(sys.argv[2], sys.argv[3], sys.argv[4])
+
+    elif option == "-c":
+        if len(sys.argv) != 4:
+            print("Error: -c option requires the keyfile to write and a ciphertext file", file=sys.stderr)
+            sys.exit(1)
+        recoverFromCiphertext(sys.argv[2], sys.argv[3], workers)
+
     else:
         print(f"Error: Unknown option {option}", file=sys.stderr)
         sys.exit(1)
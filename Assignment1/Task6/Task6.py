@@ -1,31 +1,41 @@
-def characterToNumber(char):
-    return ord(char) - ord('A')
+import os
+import sys
 
-def numberToCharacter(number):
-    return chr((number % 26) + ord('A'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cipher lives in the library; names are re-exported so existing imports of Task6 keep working
+from csci361.ciphers.fibonacci import (
+    FibonacciStreamCipher, characterToNumber, decryption, encryption, fibonacciPair, generateKeyStream,
+    iterKeyStream, keyAt, keyStreamPeriod, numberToCharacter,
+)
 
-def generateKeyStream(k0,  k1, length):
-    keys = [k0, k1]
-    for i in range(2, length):
-        nextKey = (keys[-1] + keys[-2]) % 26
-        keys.append(nextKey)
-    return keys
+def crack(cipherTextFile, kind='fibonacci'):
+    # Tries all 676 (k0, k1) seed pairs and prints the most English-like decryptions
+    from csci361.analysis import streams
+    try:
+        with open(cipherTextFile, 'r', encoding='utf-8') as file:
+            cipherText = file.read()
+    except OSError as e:
+        print(f"Error: Cannot open ciphertext file {cipherTextFile}. {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        candidates = streams.bruteForce(cipherText, kind)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-def encryption(plainText, k0, k1):
-    plainText = plainText.replace(" ", "").upper()
-    m = [characterToNumber(char) for char in plainText]
-    key = generateKeyStream(k0, k1, len(m))
-    cipher = [(m[i] + key[i]) % 26 for i in range(len(m))]
-    return ''.join(numberToCharacter(ci) for ci in cipher)
-
-def decryption(cipherText, k0, k1):
-    cipherText = cipherText.replace(" ", "").upper()
-    cipher = [characterToNumber(char) for char in cipherText]
-    key = generateKeyStream(k0, k1, len(cipher))
-    m = [(cipher[i] - key[i]) % 26 for i in range(len(cipher))]
-    return ''.join(numberToCharacter(mi) for mi in m)
+    for candidate in candidates:
+        print(f"K0 = {candidate.k0:2} K1 = {candidate.k1:2} chi-squared = {candidate.chiSquared:10.2f}  {candidate.plainText[:50]}")
+    print()
+    print(candidates[0].plainText)
 
 def main():
+    if len(sys.argv) > 1:
+        if len(sys.argv) != 3 or sys.argv[1] != '--crack':
+            print(f"Usage: {sys.argv[0]} [--crack <ciphertext.txt>]", file=sys.stderr)
+            sys.exit(1)
+        crack(sys.argv[2])
+        return
+
     # Encryption of "I LOVE WOLLONGONG" with K0 = 7, K1 = 11
     print("Encryption of I LOVE WOLLONGONG with K0 = 7 and K1 = 11")
     print(encryption("I LOVE WOLLONGONG", 7, 11))
@@ -1,178 +1,31 @@
-import time
+import argparse
+import filecmp
 import os
+import shutil
+import sys
+import tempfile
+import time
 
-class TEA:
-    def __init__(self, key):
-        if len(key) != 16:
-            raise ValueError("Key must be 16 bytes")
-        self.key = []
-        self.delta = 0x9e3779b9
-        for i in range(0, 16, 4):
-            self.key.append(int.from_bytes(key[i:i+4], 'big'))
-
-    def encryption(self, plainText):
-        if len(plainText) != 8:
-            raise ValueError("Block must be 8 bytes")
-        
-        v0 = int.from_bytes(plainText[:4], 'big')
-        v1 = int.from_bytes(plainText[:4], 'big')
-
-        k0, k1, k2, k3 = self.key
-        sumValue = 0
-
-        for _ in range(32):
-            sumValue = (sumValue + self.delta) & 0xFFFFFFFF
-            v0 = (v0 + (((v1 << 4) + k0) ^ (v1 + sumValue) ^ ((v1 >> 5) + k1))) & 0xFFFFFFFF
-            v1 = (v1 + (((v0 << 4) + k2) ^ (v0 + sumValue) ^ ((v0 >> 5) + k3))) & 0xFFFFFFFF
-
-        return v0.to_bytes(4, 'big') + v1.to_bytes(4, 'big')
-
-class CFB:
-    def __init__(self, cipher, iv):
-        self.cipher = cipher
-        self.iv = iv
-        self.blockSize = 8 
-
-    def encrypt(self, plainText, shiftRegister):
-        encryptedString = self.cipher.encryption(shiftRegister)
-        keystream = (encryptedString[0] >> 7) & 1
-        ciphertext = plainText ^ keystream
-        newString = bytearray(shiftRegister)
-
-        carry = 0
-        for i in range(len(newString) - 1, -1, -1):
-            newCarry = (newString[i] >> 7) & 1
-            newString[i] = ((newString[i] << 1 | carry)) & 0xFF
-            carry = newCarry
-
-        newString[-1] |= ciphertext
-        return ciphertext, bytes(newString)
-
-    def decrypt(self, cipherText, shiftRegister):
-        encryptedString = self.cipher.encryption(shiftRegister)
-        keystream = (encryptedString[0] >> 7) & 1
-        plaintext = cipherText ^ keystream
-        newString = bytearray(shiftRegister)
-
-        carry = 0
-        for i in range(len(newString) - 1, -1, -1):
-            newCarry = (newString[i] >> 7) & 1
-            newString[i] = ((newString[i] << 1) | carry) & 0xFF
-            carry = newCarry
-
-        newString[-1] |= cipherText
-        return plaintext, bytes(newString)
-
-class SynchronousCipher:
-    def __init__(self, k0, k1):
-        self.k0 = k0
-        self.k1 = k1
-        self.keystream = [k0, k1]
-
-    def generateKeystream(self, length):
-        while len(self.keystream) < length:
-            newKey = (self.keystream[-1] * self.keystream[-2]) % 26
-            self.keystream.append(newKey)
-        return self.keystream[:length]
-
-    def encrypt_char(self, char, key):
-        if 'A' <= char <= 'Z':
-            return chr(((ord(char) - ord('A') + key) % 26) + ord('A'))
-        return char
-
-    def decrypt_char(self, char, key):
-        if 'A' <= char <= 'Z':
-            return chr(((ord(char) - ord('A') - key) % 26) + ord('A'))
-        return char
-
-    def encryption(self, plaintext):
-        keystream = self.generateKeystream(len(plaintext))
-        result = ""
-        for i, char in enumerate(plaintext):
-            result += self.encrypt_char(char, keystream[i])
-        return result
-
-    def decryption(self, ciphertext):
-        keystream = self.generateKeystream(len(ciphertext))
-        result = ""
-        for i, char in enumerate(ciphertext):
-            result += self.decrypt_char(char, keystream[i])
-        return result
-
-class CombinationCipher:
-    def __init__(self, teaKey, iv, k0, k1):
-        self.tea = TEA(teaKey)
-        self.cfb = CFB(self.tea, iv)
-        self.syncCipher = SynchronousCipher(k0, k1)
-
-    def encryption(self, plaintext):
-        result = ""
-        shiftRegister = self.cfb.iv
-
-        keystream = self.syncCipher.generateKeystream(len(plaintext))
-
-        for i, char in enumerate(plaintext):
-            if i % 2 == 0:
-                if 'A' <= char <= 'Z':
-                    charValue = ord(char) - ord('A')
-                    encryptionBits = []
-
-                    for bitPosition in range(5):
-                        bit = (charValue >> (4 - bitPosition)) & 1
-                        encryptedBit, shiftRegister = self.cfb.encrypt(bit, shiftRegister)
-                        encryptionBits.append(encryptedBit)
-
-                    encryptedValue = 0
-                    for bit in encryptionBits:
-                        encryptedValue = (encryptedValue << 1) | bit
-                    result += chr((encryptedValue % 26) + ord('A'))
-                else:
-                    result += char
-            else:
-                result += self.syncCipher.encrypt_char(char, keystream[i])
-        return result
-
-    def decryption(self, ciphertext):
-        result = ""
-        shiftRegister = self.cfb.iv
-
-        keystream = self.syncCipher.generateKeystream(len(ciphertext))
-
-        for i, char in enumerate(ciphertext):
-            if i % 2 == 0:
-                if 'A' <= char <= 'Z':
-                    charValue = ord(char) - ord('A')
-                    decryptedBits = []
-
-                    for bitPosition in range(5):
-                        bit = (charValue >> (4 - bitPosition)) & 1
-                        decryptedBit, shiftRegister = self.cfb.decrypt(bit, shiftRegister)
-                        decryptedBits.append(decryptedBit)
-
-                    decryptedValue = 0
-                    for bit in decryptedBits:
-                        decryptedValue = (decryptedValue << 1) | bit
-                    result += chr((decryptedValue % 26) + ord('A')) 
-                else:
-                    resutl += char
-            else:
-                result += self.syncCipher.decrypt_char(char, keystream[i])
-
-        return result
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from csci361 import stats
+# The ciphers live in the library; names are re-exported so existing imports of Task7 keep working.
+# Task 7's TEA reads both block halves from the first word, which FirstWordTEA keeps.
+from csci361.ciphers.tea import FirstWordTEA as TEA
+from csci361.ciphers.cfb import CFB
+from csci361.ciphers.synchronous import SynchronousCipher
+from csci361.ciphers.combination import CombinationCipher
 
 def createTestDocument(size=200):
-    content = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG. " * 1000
-    # Repeat to reach approximately the desired size
+    # Whole 1000-sentence blocks up to size MB with the spaces removed, built directly at
+    # the final length so only one copy of the document is ever made
+    sentence = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG. "
     target_size = int(size * 1024 * 1024)
-    content_size = len(content.encode())
-    multiplier = max(1, target_size // content_size)
-    
-    # Create the document and ensure it's the right size
-    document = (content * multiplier)
-    if len(document.encode()) > target_size:
-        document = document[:target_size]
-    
-    return document.replace(" ", "").upper()
+    repeats = max(1, target_size // (len(sentence) * 1000)) * 1000
+
+    if repeats * len(sentence) > target_size:
+        # Less than one block: cut at the target size before the spaces are removed
+        return (sentence * repeats)[:target_size].replace(" ", "")
+    return sentence.replace(" ", "") * repeats
 
 def benchmarkEncryption(cipher, document, cipherName):
     print(f"\n=== {cipherName} Benchmark ===")
@@ -180,13 +33,16 @@ def benchmarkEncryption(cipher, document, cipherName):
     
     # Encryption timing
     start_time = time.time()
-    encrypted = cipher.encryption(document)
+    with stats.phase('encrypt'):
+        encrypted = cipher.encryption(document)
     encrypt_time = time.time() - start_time
     
     # Decryption timing
     start_time = time.time()
-    decrypted = cipher.decryption(encrypted)
+    with stats.phase('decrypt'):
+        decrypted = cipher.decryption(encrypted)
     decrypt_time = time.time() - start_time
+    stats.count('characters', 2 * len(document))
     
     print(f"Encryption time: {encrypt_time:.4f} seconds")
     print(f"Decryption time: {decrypt_time:.4f} seconds")
@@ -194,12 +50,107 @@ def benchmarkEncryption(cipher, document, cipherName):
     
     return encrypt_time, decrypt_time
 
+def benchmarkCorpus(size, mode, seed, corpusDir=None):
+    # Synchronous cipher at full size: the seeded corpus file is written once (and kept in
+    # corpusDir when one is given), then encrypted and decrypted file to file through mmap,
+    # so memory stays flat at any size
+    from csci361 import bench, corpus
+
+    workDir = corpusDir or tempfile.mkdtemp(prefix='task7-corpus-')
+    os.makedirs(workDir, exist_ok=True)
+    try:
+        print(f"\n=== Synchronous Cipher on a {bench.formatSize(size)} {mode} corpus ===")
+        start_time = time.time()
+        with stats.phase('documentSetup'):
+            corpusFile = corpus.ensureCorpus(workDir, size, mode, seed)
+        print(f"Corpus {corpusFile} ready in {time.time() - start_time:.2f} seconds")
+
+        cipher = SynchronousCipher(7, 11)
+        encryptedFile = os.path.join(workDir, 'corpus.enc')
+        decryptedFile = os.path.join(workDir, 'corpus.dec')
+        bench.resetPeakMemory()
+
+        start_time = time.time()
+        with stats.phase('encrypt'):
+            cipher.encryptFile(corpusFile, encryptedFile)
+        encrypt_time = time.time() - start_time
+
+        start_time = time.time()
+        with stats.phase('decrypt'):
+            cipher.decryptFile(encryptedFile, decryptedFile)
+        decrypt_time = time.time() - start_time
+
+        peak = bench.peakMemory()
+        print(f"Encryption time: {encrypt_time:.4f} seconds ({size / 1024 / 1024 / encrypt_time:.1f} MB/s)")
+        print(f"Decryption time: {decrypt_time:.4f} seconds ({size / 1024 / 1024 / decrypt_time:.1f} MB/s)")
+        if peak:
+            print(f"Peak RSS: {peak / 1024 / 1024:.1f} MB")
+        print(f"Round trip: {'PASS' if filecmp.cmp(corpusFile, decryptedFile, shallow=False) else 'FAIL'}")
+    finally:
+        if corpusDir is None:
+            shutil.rmtree(workDir, ignore_errors=True)
+        else:
+            for path in (os.path.join(workDir, 'corpus.enc'), os.path.join(workDir, 'corpus.dec')):
+                if os.path.exists(path):
+                    os.remove(path)
+
+def crackSynchronous(cipherTextFile):
+    # Tries all 676 (k0, k1) seed pairs of the synchronous cipher and prints the best decryptions
+    from csci361.analysis import streams
+    try:
+        with stats.phase('read'), open(cipherTextFile, 'r', encoding='utf-8') as file:
+            cipherText = file.read()
+    except OSError as e:
+        print(f"Error: Cannot open ciphertext file {cipherTextFile}. {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        with stats.phase('crack'):
+            candidates = streams.bruteForce(cipherText, 'synchronous')
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for candidate in candidates:
+        print(f"K0 = {candidate.k0:2} K1 = {candidate.k1:2} chi-squared = {candidate.chiSquared:10.2f}  {candidate.plainText[:50]}")
+    print()
+    print(candidates[0].plainText)
+
 def main():
+    # --stats[=FILE] and --stats-memory report phase timings and counters as JSON on exit
+    statsOutput, traceMemory = stats.takeFlags(sys.argv)
+    if statsOutput:
+        stats.enable(statsOutput, traceMemory)
+
+    from csci361 import bench, corpus
+
+    parser = argparse.ArgumentParser(description="Task 7 combined CFB and synchronous cipher demo and benchmark",
+                                     epilog="--stats[=FILE] and --stats-memory are also accepted.")
+    parser.add_argument('--crack', metavar='CIPHERTEXT', help='Recover the synchronous cipher seeds of a ciphertext')
+    parser.add_argument('--corpus', metavar='SIZE',
+                        help='Benchmark the synchronous cipher on a generated corpus of SIZE (e.g. 200M) streamed from disk')
+    parser.add_argument('--mode', choices=corpus.MODES, default=corpus.MODES[0], help='Corpus letter distribution')
+    parser.add_argument('--seed', type=int, default=corpus.DEFAULT_SEED, help='Corpus seed')
+    parser.add_argument('--corpus-dir', help='Keep the corpus file here and reuse it on later runs')
+    args = parser.parse_args()
+
+    if args.crack:
+        crackSynchronous(args.crack)
+        return
+    if args.corpus:
+        try:
+            size = bench.parseSize(args.corpus)
+        except ValueError:
+            print(f"Error: Invalid corpus size '{args.corpus}'", file=sys.stderr)
+            sys.exit(1)
+        benchmarkCorpus(size, args.mode, args.seed, args.corpus_dir)
+        return
+
     print("=== Task 7: Combined CFB and Synchronous Cipher ===\n")
     
     # Step 1: Create test document (200MB equivalent in characters)
     print("Step 1: Creating test document...")
-    test_document = createTestDocument(1)  # Using 1MB for demo (200MB would be very slow)
+    with stats.phase('documentSetup'):
+        test_document = createTestDocument(1)  # Using 1MB for demo (200MB would be very slow)
     print(f"Created document with {len(test_document)} characters")
     
     # Initialize cipher parameters
@@ -230,7 +181,8 @@ def main():
     
     # Step 3: Test hybrid cipher
     print(f"\n=== Testing Combination Cipher ===")
-    hybrid = CombinationCipher(tea_key, iv, k0, k1)
+    with stats.phase('keySetup'):
+        hybrid = CombinationCipher(tea_key, iv, k0, k1)
     
     # Test with short message first
     hybrid_encrypted = hybrid.encryption(test_msg)
@@ -244,7 +196,8 @@ def main():
     print(f"\n=== Performance Comparison ===")
     
     # Use smaller document for demonstration
-    benchmark_doc = createTestDocument(0.1)  # 0.1 MB for faster demo
+    with stats.phase('documentSetup'):
+        benchmark_doc = createTestDocument(0.1)  # 0.1 MB for faster demo
     
     # Benchmark synchronous cipher only
     sync_encrypt_time, sync_decrypt_time = benchmarkEncryption(
@@ -0,0 +1,254 @@
+import argparse
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for task in ('Task2', 'Task4', 'Task5', 'Task6', 'Task7'):
+    sys.path.insert(0, os.path.join(BASE_DIR, task))
+sys.path.insert(0, BASE_DIR)
+
+from csci361 import bench
+
+# Reproducible throughput benchmark for every Assignment 1 cipher.
+# Each (cipher, operation, size) is warmed up, timed repeat times with perf_counter_ns
+# and reported as median and p95 MB/s with the peak RSS of the timed runs;
+# results are written as JSON for comparing commits.
+
+DEFAULT_SIZES = '1K,64K,1M,16M,256M,1G'
+WORDS = ("the quick brown fox jumps over lazy dog cipher secret message wollongong "
+         "university student key stream block feedback register attack at dawn").split()
+
+TEA_KEY = b"YELLOW SUBMARINE"
+TEA_IV = b"INITVECT"
+
+def textCorpus(size, seed, upper=False):
+    # Deterministic English-like text: a 1 MB block of seeded words, repeated to size
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    blockSize = min(size, 1024 * 1024)
+    while length < blockSize:
+        word = rng.choice(WORDS)
+        if not upper and rng.random() < 0.1:
+            word = word.capitalize() + rng.choice(('.', ',', '!'))
+        words.append(word)
+        length += len(word) + 1
+    block = ' '.join(words)
+    if upper:
+        block = block.replace(' ', '').upper()
+    text = block * (size // len(block) + 1)
+    return text[:size]
+
+def binaryCorpus(size, seed):
+    rng = random.Random(seed)
+    block = rng.randbytes(min(size, 1024 * 1024))
+    return (block * (size // len(block) + 1))[:size]
+
+def binaryCorpusFile(path, size, seed):
+    # Same bytes as binaryCorpus, written a block at a time so large files need no large buffer
+    block = random.Random(seed).randbytes(min(size, 1024 * 1024))
+    with open(path, 'wb') as f:
+        for offset in range(0, size, len(block)):
+            f.write(block[:size - offset])
+    return path
+
+def task2Case():
+    import Task2
+    cipherKey = Task2.generateCipherKey("STRAWBERRY")
+    encryptTable = Task2.generateTranslationTable(cipherKey)
+    decryptTable = Task2.generateTranslationTable(Task2.generateDecipherKey(cipherKey))
+    return (lambda text: Task2.translateMessage(text, encryptTable),
+            lambda text: Task2.translateMessage(text, decryptTable))
+
+def kamasutraCase():
+    import kamasutra
+    table = kamasutra.createTranslationTable(kamasutra.createCipherMapping("qwertyuiopasdfghjklzxcvbnm"))
+    return (lambda text: text.translate(table), lambda text: text.translate(table))
+
+def task6Case():
+    import Task6
+    return (lambda text: Task6.encryption(text, 7, 11), lambda text: Task6.decryption(text, 7, 11))
+
+def teaCfbCase(feedbackBits):
+    def build():
+        import TEACFB5
+        cipher = TEACFB5.TEA_CFB(TEA_KEY)
+        return (lambda data: cipher.encryption(data, TEA_IV, feedbackBits),
+                lambda data: cipher.decryption(data, TEA_IV, feedbackBits))
+    return build
+
+def teaCfbFileCase(feedbackBits):
+    # File to file through the mmap API; the functions take and return file paths
+    def build():
+        import TEACFB5
+        cipher = TEACFB5.TEA_CFB(TEA_KEY)
+        def encrypt(path):
+            cipher.encryptFile(path, path + '.enc', TEA_IV, feedbackBits)
+            return path + '.enc'
+        def decrypt(path):
+            cipher.decryptFile(path, path + '.dec', TEA_IV, feedbackBits)
+            return path + '.dec'
+        return encrypt, decrypt
+    return build
+
+def teaFamilyCtrCase(name):
+    # One process, so the TEA family members are compared on the same footing
+    def build():
+        from csci361 import ciphers
+        cipher = ciphers.CTR(getattr(ciphers, name)(TEA_KEY), TEA_IV, workers=1)
+        return cipher.encrypt, cipher.decrypt
+    return build
+
+def teaFamilyBlockCase(name, **options):
+    # Bulk block encryption (ECB) of whole blocks; any partial last block is left out
+    def build():
+        from csci361 import ciphers
+        cipher = getattr(ciphers, name)(TEA_KEY, **options)
+        blockSize = getattr(cipher, 'blockSize', 8)
+        whole = lambda data: data[:len(data) - len(data) % blockSize]
+        return (lambda data: cipher.encryptBlocks(whole(data)), lambda data: cipher.decryptBlocks(whole(data)))
+    return build
+
+def synchronousFileCase():
+    # File to file over the seeded corpus, streamed through mmap windows
+    def build():
+        import Task7
+        cipher = Task7.SynchronousCipher(7, 11)
+        def encrypt(path):
+            cipher.encryptFile(path, path + '.enc')
+            return path + '.enc'
+        def decrypt(path):
+            cipher.decryptFile(path, path + '.dec')
+            return path + '.dec'
+        return encrypt, decrypt
+    return build
+
+def combinationCase():
+    import Task7
+    cipher = Task7.CombinationCipher(TEA_KEY, TEA_IV, 7, 11)
+    return cipher.encryption, cipher.decryption
+
+# name -> (builder, corpus kind, default size limit in bytes)
+# The per-bit TEA modes are limited by default so a full run finishes; --no-limits lifts that
+CASES = {
+    'task2': (task2Case, 'text', None),
+    'kamasutra': (kamasutraCase, 'text', None),
+    'task6': (task6Case, 'upper', None),
+    'tea-cfb-1': (teaCfbCase(1), 'binary', 16 * 1024),
+    'tea-cfb-64': (teaCfbCase(64), 'binary', 1024 * 1024),
+    'tea-cfb-64-file': (teaCfbFileCase(64), 'file', 1024 * 1024),
+    'tea-ctr': (teaFamilyCtrCase('TEA'), 'binary', None),
+    'xtea-ctr': (teaFamilyCtrCase('XTEA'), 'binary', None),
+    'xxtea-ctr': (teaFamilyCtrCase('XXTEA'), 'binary', None),
+    'tea-ecb': (teaFamilyBlockCase('TEA'), 'binary', None),
+    'xtea-ecb': (teaFamilyBlockCase('XTEA'), 'binary', None),
+    # 1 KB blocks: 6 cycles of 256 word updates instead of 128 blocks of 32 TEA cycles
+    'xxtea-wide': (teaFamilyBlockCase('XXTEA', blockWords=256), 'binary', None),
+    'combination': (combinationCase, 'upper', 64 * 1024),
+    'sync-file': (synchronousFileCase(), 'corpus', None),
+}
+
+def makeCorpus(kind, size, seed, workDir):
+    if kind == 'file':
+        return binaryCorpusFile(os.path.join(workDir, f'corpus-{size}'), size, seed)
+    if kind == 'corpus':
+        from csci361 import corpus
+        return corpus.ensureCorpus(workDir, size, 'english', seed)
+    if kind == 'binary':
+        return binaryCorpus(size, seed)
+    return textCorpus(size, seed, upper=(kind == 'upper'))
+
+def gitCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runCases(names, sizes, args, report, workDir):
+    print(f"{'Cipher':<16} {'Op':<8} {'Size':>6} {'Median MB/s':>12} {'p95 MB/s':>10} {'Peak RSS':>10}")
+    for name in names:
+        build, kind, limit = CASES[name]
+        encrypt, decrypt = build()
+        for size in sizes:
+            if limit is not None and size > limit and not args.no_limits:
+                print(f"{name:<16} {'-':<8} {bench.formatSize(size):>6} {'skipped (over default limit)':>23}")
+                continue
+            plain = makeCorpus(kind, size, args.seed, workDir)
+            cipherText = encrypt(plain)
+            for operation, function, data in (('encrypt', encrypt, plain), ('decrypt', decrypt, cipherText)):
+                bench.resetPeakMemory()
+                timings = bench.measure(lambda: function(data), args.warmup, args.repeat)
+                result = {'cipher': name, 'operation': operation, 'size': size}
+                result.update(bench.summarize(timings, size))
+                result['peakRssBytes'] = bench.peakMemory()
+                report['results'].append(result)
+                peak = f"{result['peakRssBytes'] / 1024 / 1024:.1f}M" if result['peakRssBytes'] else '-'
+                print(f"{name:<16} {operation:<8} {bench.formatSize(size):>6} "
+                      f"{result['medianMBps']:>12.3f} {result['p95MBps']:>10.3f} {peak:>10}")
+            if kind in ('file', 'corpus'):
+                for path in (plain, cipherText, cipherText[:-len('.enc')] + '.dec'):
+                    if os.path.exists(path):
+                        os.remove(path)
+            del plain, cipherText
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Assignment 1 ciphers and write the results as JSON")
+    parser.add_argument('-c', '--ciphers', default=','.join(CASES),
+                        help=f"Comma separated ciphers to run (default: all of {', '.join(CASES)})")
+    parser.add_argument('-s', '--sizes', default=DEFAULT_SIZES, help=f'Comma separated input sizes (default {DEFAULT_SIZES})')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Timed runs per measurement (default 5)')
+    parser.add_argument('-w', '--warmup', type=int, default=1, help='Untimed warm-up runs (default 1)')
+    parser.add_argument('--seed', type=int, default=361, help='Seed for the generated inputs')
+    parser.add_argument('--no-limits', action='store_true', help='Run the slow per-bit modes at every size')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='JSON results file (default benchmark.json)')
+    parser.add_argument('--compare', metavar='BASELINE_JSON', help='Fail if median throughput regressed against this file')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed slowdown for --compare (default 0.10)')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.ciphers.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        print(f"Error: Unknown cipher(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    if args.repeat < 1 or args.warmup < 0:
+        print("Error: --repeat must be at least 1 and --warmup at least 0", file=sys.stderr)
+        sys.exit(1)
+    sizes = [bench.parseSize(size) for size in args.sizes.split(',')]
+
+    report = {
+        'commit': gitCommit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'warmup': args.warmup,
+        'seed': args.seed,
+        'results': [],
+    }
+
+    workDir = tempfile.mkdtemp(prefix='csci361-bench-')
+    try:
+        runCases(names, sizes, args, report, workDir)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    bench.writeJson(args.output, report)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = bench.compareResults(report, bench.readJson(args.compare), args.tolerance)
+        for result, old in regressions:
+            print(f"Regression: {result['cipher']} {result['operation']} {bench.formatSize(result['size'])}: "
+                  f"{old['medianMBps']:.2f} -> {result['medianMBps']:.2f} MB/s", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Shared engines used by the Assignment 1 task scripts
@@ -0,0 +1 @@
+# Cryptanalysis tools for the Assignment 1 ciphers: n-gram scoring and key recovery
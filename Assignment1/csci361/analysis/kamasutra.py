@@ -0,0 +1,188 @@
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from csci361.analysis import ngrams, search
+from csci361.ciphers.kamasutra import createCipherMapping, writeKeyfile
+
+# Key recovery for the Kama-Sutra cipher (Task 4). A candidate key is a 26-byte array of
+# partners, partners[x] = the letter x is swapped with, so applying the key is one gather.
+# 'f' and 'u' are never substituted, so each is its own partner and the search leaves them alone.
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+FIXED = (ALPHABET.index('f'), ALPHABET.index('u'))
+PAIRED = [letter for letter in range(26) if letter not in FIXED]
+# Pads a letter that maps to itself in a key string; createCipherMapping skips non-letters
+FILLER = '-'
+
+KnownPlaintextResult = namedtuple('KnownPlaintextResult', ['partners', 'conflicts', 'unseen'])
+RecoveryResult = namedtuple('RecoveryResult', ['score', 'partners', 'key'])
+
+def partnersFromKey(key) -> np.ndarray:
+    partners = np.arange(26, dtype=np.uint8)
+    for first, second in createCipherMapping(key).items():
+        partners[ord(first) - 97] = ord(second) - 97
+    partners[list(FIXED)] = FIXED
+    return partners
+
+def keyFromPartners(partners) -> str:
+    # Key string whose createCipherMapping is this pairing: the first half lists one letter of
+    # each pair and the mirrored position holds its partner
+    front, back = [], []
+    done = set()
+    for letter in range(26):
+        if letter in done:
+            continue
+        partner = int(partners[letter])
+        done.update((letter, partner))
+        front.append(ALPHABET[letter])
+        back.append(ALPHABET[partner] if partner != letter else FILLER)
+    return ''.join(front) + ''.join(reversed(back))
+
+def alignedCodes(plainText, cipherText):
+    # Letter codes at the positions where both texts hold a letter; the cipher keeps every
+    # non-letter where it was, so a mismatch means the texts are not aligned
+    if isinstance(plainText, str):
+        plainText = plainText.encode('utf-8')
+    if isinstance(cipherText, str):
+        cipherText = cipherText.encode('utf-8')
+    if len(plainText) != len(cipherText):
+        raise ValueError("Plaintext and ciphertext must be the same length")
+    plain = np.frombuffer(plainText, dtype=np.uint8) & 0xDF
+    cipher = np.frombuffer(cipherText, dtype=np.uint8) & 0xDF
+    plainLetters = (plain >= 65) & (plain <= 90)
+    cipherLetters = (cipher >= 65) & (cipher <= 90)
+    if not np.array_equal(plainLetters, cipherLetters):
+        raise ValueError("Plaintext and ciphertext are not aligned")
+    return plain[plainLetters] - 65, cipher[cipherLetters] - 65
+
+def knownPlaintext(plainText, cipherText) -> KnownPlaintextResult:
+    # Reads the pairing off aligned texts. Letters the texts never show are paired with each
+    # other in alphabetical order; conflicts lists letters seen with more than one partner.
+    plain, cipher = alignedCodes(plainText, cipherText)
+    counts = np.bincount(plain.astype(np.intp) * 26 + cipher, minlength=676).reshape(26, 26)
+    # The pairing is symmetric, so an observed p -> c also says c -> p
+    counts = counts + counts.T
+
+    partners = np.arange(26, dtype=np.uint8)
+    observed = counts.sum(axis=1) > 0
+    conflicts = []
+    for letter in PAIRED:
+        if not observed[letter]:
+            continue
+        seen = np.flatnonzero(counts[letter])
+        if len(seen) > 1:
+            conflicts.append(ALPHABET[letter])
+        partners[letter] = int(np.argmax(counts[letter]))
+    for letter in PAIRED:
+        if observed[letter] and partners[partners[letter]] != letter:
+            conflicts.append(ALPHABET[letter])
+
+    unseen = [letter for letter in PAIRED if not observed[letter]]
+    for first, second in zip(unseen[0::2], unseen[1::2]):
+        partners[first], partners[second] = second, first
+    partners[list(FIXED)] = FIXED
+    return KnownPlaintextResult(partners, sorted(set(conflicts)), ''.join(ALPHABET[letter] for letter in unseen))
+
+def bigramCounts(codes) -> np.ndarray:
+    # 26x26 counts of consecutive cipher letters; the search never looks at the text again
+    if len(codes) < 2:
+        return np.zeros((26, 26), dtype=np.float64)
+    return np.bincount(codes[:-1].astype(np.intp) * 26 + codes[1:], minlength=676).reshape(26, 26).astype(np.float64)
+
+class PairingSearch:
+    # Score = sum over cipher bigrams (i, j) of counts[i, j] * logP(partners[i], partners[j]).
+    # A move re-pairs two pairs (a, b), (c, d) into (a, c), (b, d) or (a, d), (b, c). It only
+    # changes the four rows and four columns of those letters, so its score change costs the
+    # same whatever the length of the ciphertext, and every move is scored in one batch.
+    def __init__(self, counts, table):
+        self.counts = counts
+        self.logP = table.reshape(26, 26).astype(np.float64)
+        pairs = np.array([(a, c) for a in PAIRED for c in PAIRED if a < c], dtype=np.intp)
+        self.firsts = np.concatenate([pairs[:, 0], pairs[:, 0]])
+        self.seconds = np.concatenate([pairs[:, 1], pairs[:, 1]])
+        self.crossed = np.repeat([False, True], len(pairs))
+
+    def score(self, partners) -> float:
+        return float((self.counts * self.logP[np.ix_(partners, partners)]).sum())
+
+    def moves(self, partners):
+        # Letters touched by each move and their partners after it
+        a, c = self.firsts, self.seconds
+        b, d = partners[a], partners[c]
+        valid = (b != c) & (b != a) & (d != c)
+        a, b, c, d, crossed = a[valid], b[valid], c[valid], d[valid], self.crossed[valid]
+        letters = np.stack([a, b, c, d], axis=1)
+        newPartners = np.where(crossed[:, None], np.stack([d, c, b, a], axis=1), np.stack([c, d, a, b], axis=1))
+        return letters, newPartners
+
+    def moveDeltas(self, partners, letters, newPartners):
+        partners = partners.astype(np.intp)
+        rows = np.arange(len(letters))[:, None]
+        trial = np.tile(partners, (len(letters), 1))
+        trial[rows, letters] = newPartners
+        oldPartners = partners[letters]
+        logP, counts = self.logP, self.counts
+
+        rowTerms = counts[letters] * (logP[newPartners[:, :, None], trial[:, None, :]]
+                                      - logP[oldPartners[:, :, None], partners[None, None, :]])
+        colTerms = counts[:, letters].transpose(1, 0, 2) * (logP[trial[:, :, None], newPartners[:, None, :]]
+                                                             - logP[partners[None, :, None], oldPartners[:, None, :]])
+        # Terms with both row and column among the four letters were counted twice
+        bothTerms = counts[letters[:, :, None], letters[:, None, :]] * (
+            logP[newPartners[:, :, None], newPartners[:, None, :]] - logP[oldPartners[:, :, None], oldPartners[:, None, :]])
+        return rowTerms.sum(axis=(1, 2)) + colTerms.sum(axis=(1, 2)) - bothTerms.sum(axis=(1, 2))
+
+    def climb(self, partners):
+        # Steepest ascent: apply the best move until none improves the score
+        partners = np.array(partners, dtype=np.uint8)
+        current = self.score(partners)
+        while True:
+            letters, newPartners = self.moves(partners)
+            if len(letters) == 0:
+                break
+            deltas = self.moveDeltas(partners, letters, newPartners)
+            best = int(np.argmax(deltas))
+            if deltas[best] <= 1e-9:
+                break
+            partners[letters[best]] = newPartners[best]
+            current += float(deltas[best])
+        return current, partners
+
+def randomPartners(rng) -> np.ndarray:
+    letters = list(PAIRED)
+    rng.shuffle(letters)
+    partners = np.arange(26, dtype=np.uint8)
+    for first, second in zip(letters[0::2], letters[1::2]):
+        partners[first], partners[second] = second, first
+    partners[list(FIXED)] = FIXED
+    return partners
+
+def runRestarts(counts, table, seeds, starts=()):
+    searcher = PairingSearch(counts, table)
+    best = (float('-inf'), None)
+    for index, seed in enumerate(seeds):
+        rng = random.Random(seed)
+        partners = np.array(starts[index], dtype=np.uint8) if index < len(starts) else randomPartners(rng)
+        result = searcher.climb(partners)
+        if result[0] > best[0]:
+            best = result
+    return best[0], best[1].tolist()
+
+def recoverKey(cipherText, table=None, restarts=16, workers=None, seed=None, starts=()) -> RecoveryResult:
+    # Ciphertext-only: hill-climbs over pairings on bigram scores, restarts split across processes
+    if table is None:
+        table = ngrams.getTable(2)
+    if restarts < 1:
+        raise ValueError("Number of restarts must be positive")
+    counts = bigramCounts(ngrams.letterCodes(cipherText))
+    seeds = [random.Random(seed).getrandbits(64) + i for i in range(max(restarts, len(starts)))]
+    score, partners = search.runRestarts(runRestarts, (counts, table), seeds, [list(start) for start in starts], workers)
+    partners = np.array(partners, dtype=np.uint8)
+    return RecoveryResult(score, partners, keyFromPartners(partners))
+
+def writeRecoveredKey(keyfile, partners) -> str:
+    key = keyFromPartners(partners)
+    writeKeyfile(keyfile, key)
+    return key
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+from csci361 import keycache
+
+# Flat n-gram log-probability tables over A-Z. The n-gram c0 c1 ... c(n-1) lives at
+# index c0 * 26^(n-1) + ... + c(n-1), so a whole text is scored with one gather and a sum.
+
+ALPHABET_SIZE = 26
+
+# Relative letter frequencies of English text, A-Z
+ENGLISH_FREQUENCIES = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+
+def defaultCorpus() -> str:
+    # The Python reference prose ships with every interpreter, so a table can always be built.
+    # It is adequate for a few hundred letters of ciphertext; pass a book-length corpus for better odds.
+    from pydoc_data.topics import topics
+    return '\n'.join(topics.values())
+
+def letterCodes(text) -> np.ndarray:
+    # A-Z (either case) as 0..25; everything else, including spaces, is dropped
+    if isinstance(text, str):
+        text = text.encode('ascii', 'ignore')
+    codes = np.frombuffer(bytes(text), dtype=np.uint8) & 0xDF
+    return codes[(codes >= 65) & (codes <= 90)] - 65
+
+def ngramWeights(n) -> np.ndarray:
+    return ALPHABET_SIZE ** np.arange(n - 1, -1, -1, dtype=np.int64)
+
+def ngramIndices(codes, n) -> np.ndarray:
+    # Index of every overlapping n-gram in a 0..25 code array
+    if len(codes) < n:
+        return np.empty(0, dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(codes.astype(np.int64), n)
+    return windows @ ngramWeights(n)
+
+def buildTable(text, n) -> np.ndarray:
+    # log10 probabilities; unseen n-grams get a floor below the rarest observed one
+    indices = ngramIndices(letterCodes(text), n)
+    if len(indices) == 0:
+        raise ValueError("Training text has no letters")
+    counts = np.bincount(indices, minlength=ALPHABET_SIZE ** n).astype(np.float64)
+    total = counts.sum()
+    table = np.full(len(counts), np.log10(0.01 / total))
+    seen = counts > 0
+    table[seen] = np.log10(counts[seen] / total)
+    return table.astype(np.float32)
+
+def saveTable(filename, table) -> None:
+    np.save(filename, table)
+
+def loadTable(filename, n) -> np.ndarray:
+    table = np.load(filename)
+    if table.shape != (ALPHABET_SIZE ** n,):
+        raise ValueError(f"'{filename}' is not a {n}-gram table")
+    return table.astype(np.float32, copy=False)
+
+# Tables loaded or trained in this process. File-based entries are keyed by path, mtime and
+# size like keyfiles, so an edited file is read again; they are not key material, so they stay
+# out of the key cache and its LRU
+tables = {}
+
+def cachedTable(cacheKey, build) -> np.ndarray:
+    if cacheKey not in tables:
+        tables[cacheKey] = build()
+    return tables[cacheKey]
+
+def getTable(n, corpus=None, tableFile=None) -> np.ndarray:
+    # Loads tableFile when it exists, otherwise trains on the corpus file (or the default corpus)
+    # and saves the result to tableFile
+    if tableFile and os.path.exists(tableFile):
+        return cachedTable(keycache.fileCacheKey(f'ngrams{n}', tableFile), lambda: loadTable(tableFile, n))
+
+    if corpus:
+        def build():
+            with open(corpus, 'r', encoding='utf-8', errors='ignore') as file:
+                return buildTable(file.read(), n)
+        table = cachedTable(keycache.fileCacheKey(f'ngrams{n}', corpus), build)
+    else:
+        table = cachedTable((f'ngrams{n}', None), lambda: buildTable(defaultCorpus(), n))
+
+    if tableFile:
+        saveTable(tableFile, table)
+    return table
+
+def score(codes, table, n) -> float:
+    return float(table[ngramIndices(codes, n)].sum())
+
+def indexOfCoincidence(codes) -> float:
+    # About 0.066 for English under any monoalphabetic key, nearer 0.038 for polyalphabetic ciphertext
+    if len(codes) < 2:
+        return 0.0
+    counts = np.bincount(codes, minlength=ALPHABET_SIZE).astype(np.float64)
+    return float((counts * (counts - 1)).sum() / (len(codes) * (len(codes) - 1)))
+
+def chiSquared(counts) -> np.ndarray:
+    # Chi-squared distance of letter counts (..., 26) from English; lower is more English-like
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum(axis=-1, keepdims=True) * ENGLISH_FREQUENCIES
+    return ((counts - expected) ** 2 / expected).sum(axis=-1)
@@ -0,0 +1,18 @@
+import os
+
+# Random-restart searches split across worker processes. A worker gets its share of
+# the seeds (and of the fixed starting points) and returns its best (score, key).
+
+def runRestarts(worker, args, seeds, starts=(), workers=None):
+    # worker(*args, seeds, starts) -> (score, key); returns the best result over all shares
+    workers = min(workers or os.cpu_count() or 1, len(seeds))
+    if workers == 1:
+        return worker(*args, seeds, list(starts))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts = list(starts)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, *args, seeds[i::workers], starts[i::workers]) for i in range(workers)]
+        results = [future.result() for future in futures]
+    return max(results, key=lambda result: result[0])
@@ -0,0 +1,97 @@
+from collections import namedtuple
+
+import numpy as np
+
+from csci361.analysis import ngrams
+from csci361.ciphers import fibonacci
+from csci361.ciphers.synchronous import SynchronousCipher
+
+# Exhaustive search of the 26 x 26 seed pairs of the Task 6 Fibonacci cipher and the Task 7
+# synchronous cipher. Both recurrences are eventually periodic, so each seed's pre-period
+# and one cycle are computed once per process; the keystream values at the scored positions
+# are gathered from them for all 676 seeds, a ciphertext prefix is decrypted against every
+# row in one broadcast, and only the best-scoring seeds are decrypted in full.
+
+# Characters scored per seed; a few hundred letters are plenty for chi-squared
+DEFAULT_PREFIX = 512
+DEFAULT_TOP = 3
+
+Candidate = namedtuple('Candidate', ['k0', 'k1', 'chiSquared', 'plainText'])
+
+SEEDS = np.array([(k0, k1) for k0 in range(26) for k1 in range(26)], dtype=np.int64)
+
+# kind -> (values, starts, periods): values[row] is seed row's pre-period followed by one
+# cycle, padded with zeros; the cycle starts at starts[row] and is periods[row] long
+seedCycles = {}
+
+def cycleTable(kind):
+    if kind not in ('fibonacci', 'synchronous'):
+        raise ValueError(f"Unknown keystream kind '{kind}'")
+    if kind not in seedCycles:
+        rows = []
+        for k0, k1 in SEEDS.tolist():
+            if kind == 'fibonacci':
+                rows.append(((), fibonacci.keyStreamPeriod(k0, k1)))
+            else:
+                rows.append(SynchronousCipher.findPeriod(k0, k1))
+        values = np.zeros((len(rows), max(len(pre) + len(cycle) for pre, cycle in rows)), dtype=np.uint8)
+        for row, (pre, cycle) in enumerate(rows):
+            values[row, :len(pre) + len(cycle)] = list(pre) + list(cycle)
+        starts = np.array([len(pre) for pre, cycle in rows], dtype=np.intp)
+        periods = np.array([len(cycle) for pre, cycle in rows], dtype=np.intp)
+        seedCycles[kind] = (values, starts, periods)
+    return seedCycles[kind]
+
+def keystreamsAt(kind, positions) -> np.ndarray:
+    # (676, len(positions)) keystream values; row k0 * 26 + k1 belongs to seeds (k0, k1)
+    values, starts, periods = cycleTable(kind)
+    positions = np.asarray(positions, dtype=np.intp)[None, :]
+    starts, periods = starts[:, None], periods[:, None]
+    index = np.where(positions < starts, positions, starts + (positions - starts) % periods)
+    return np.take_along_axis(values, index, axis=1)
+
+def rankSeeds(letters, keystreams) -> np.ndarray:
+    # Chi-squared of every seed's decryption of letters (0..25) under its keystream row
+    plain = (letters[None, :] + np.uint8(26)) - keystreams
+    plain %= 26
+    rows = np.arange(len(keystreams), dtype=np.intp)[:, None] * 26
+    counts = np.bincount((rows + plain).ravel(), minlength=len(keystreams) * 26).reshape(-1, 26)
+    return ngrams.chiSquared(counts)
+
+def fibonacciPrefix(cipherText, prefix):
+    # Task 6 shifts every character once spaces are removed, so every position is scored
+    text = cipherText.replace(" ", "").upper()[:prefix]
+    codes = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8)
+    return ((codes.astype(np.int16) - 65) % 26).astype(np.uint8), np.arange(len(codes))
+
+def synchronousPrefix(cipherText, prefix):
+    # The synchronous cipher only shifts A-Z but still advances the keystream on other characters
+    codes = np.frombuffer(cipherText[:prefix].encode('ascii', 'replace'), dtype=np.uint8)
+    positions = np.flatnonzero((codes >= 65) & (codes <= 90))
+    return codes[positions] - np.uint8(65), positions
+
+def bruteForce(cipherText, kind='fibonacci', top=DEFAULT_TOP, prefix=DEFAULT_PREFIX) -> list:
+    # Best top seeds, most English-like first, each with its full decryption
+    if prefix < 2:
+        raise ValueError("Prefix must be at least two characters")
+    if kind == 'fibonacci':
+        letters, positions = fibonacciPrefix(cipherText, prefix)
+    elif kind == 'synchronous':
+        letters, positions = synchronousPrefix(cipherText, prefix)
+    else:
+        raise ValueError(f"Unknown cipher kind '{kind}'")
+    if len(letters) == 0:
+        raise ValueError("Ciphertext has no letters to score")
+
+    scores = rankSeeds(letters, keystreamsAt(kind, positions))
+    best = np.argsort(scores, kind='stable')[:top]
+
+    candidates = []
+    for row in best:
+        k0, k1 = (int(value) for value in SEEDS[row])
+        if kind == 'fibonacci':
+            plainText = fibonacci.decryption(cipherText, k0, k1)
+        else:
+            plainText = SynchronousCipher(k0, k1).decryption(cipherText)
+        candidates.append(Candidate(k0, k1, float(scores[row]), plainText))
+    return candidates
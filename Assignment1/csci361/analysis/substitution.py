@@ -0,0 +1,178 @@
+import random
+from collections import namedtuple
+from itertools import combinations
+
+import numpy as np
+
+from csci361.analysis import ngrams, search
+from csci361.ciphers.substitution import generateCipherKey, generateTranslationTable, removeDuplicateCharacters, translateMessage
+
+# Key recovery for monoalphabetic substitution (Task 1 ciphertexts, Task 2 keyword cipher).
+# A key is a 26-entry array dec, with dec[cipherLetter] = plainLetter, scored by quadgram
+# log-probability. Hill-climbing swaps two entries at a time and only rescores the
+# quadgrams that contain one of the two cipher letters.
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Plain letters from most to least frequent, used to build the frequency-matched starting key
+ENGLISH_ORDER = "ETAOINSHRDLCUMWFGYPBVKJXQZ"
+N = 4
+
+CrackResult = namedtuple('CrackResult', ['score', 'decipherKey', 'keyword', 'plainText'])
+
+class SwapScorer:
+    def __init__(self, codes, table):
+        self.table = table
+        self.weights = ngrams.ngramWeights(N)
+        self.windows = np.lib.stride_tricks.sliding_window_view(codes.astype(np.intp), N)
+        # Quadgram start positions that contain each cipher letter
+        self.positions = [np.flatnonzero((self.windows == letter).any(axis=1)) for letter in range(26)]
+        present = [letter for letter in range(26) if len(self.positions[letter])]
+        self.pairs = [(a, b) for a, b in combinations(range(26), 2) if a in present or b in present]
+        self.pairPositions = {}
+
+    def score(self, dec) -> float:
+        return float(self.table[dec[self.windows] @ self.weights].sum())
+
+    def affected(self, a, b):
+        key = (a, b)
+        if key not in self.pairPositions:
+            self.pairPositions[key] = np.union1d(self.positions[a], self.positions[b])
+        return self.pairPositions[key]
+
+    def swapDelta(self, dec, a, b) -> float:
+        # Score change from swapping dec[a] and dec[b], computed on the affected quadgrams only
+        windows = self.windows[self.affected(a, b)]
+        before = self.table[dec[windows] @ self.weights].sum()
+        dec[a], dec[b] = dec[b], dec[a]
+        after = self.table[dec[windows] @ self.weights].sum()
+        dec[a], dec[b] = dec[b], dec[a]
+        return float(after - before)
+
+    def climb(self, dec, rng):
+        # First-improvement hill-climbing until no single swap helps
+        dec = dec.copy()
+        current = self.score(dec)
+        pairs = list(self.pairs)
+        improved = True
+        while improved:
+            improved = False
+            rng.shuffle(pairs)
+            for a, b in pairs:
+                delta = self.swapDelta(dec, a, b)
+                if delta > 1e-6:
+                    dec[a], dec[b] = dec[b], dec[a]
+                    current += delta
+                    improved = True
+        return current, dec
+
+def frequencyKey(codes) -> np.ndarray:
+    # Most frequent cipher letter -> E, next -> T, and so on
+    counts = np.bincount(codes, minlength=26)
+    order = np.argsort(-counts, kind='stable')
+    dec = np.empty(26, dtype=np.intp)
+    dec[order] = [ALPHABET.index(char) for char in ENGLISH_ORDER]
+    return dec
+
+def keywordDecipherArray(keyword) -> np.ndarray:
+    cipherKey = generateCipherKey(keyword)
+    dec = np.empty(26, dtype=np.intp)
+    for plain, cipher in cipherKey.items():
+        dec[ord(cipher) - 65] = ord(plain) - 65
+    return dec
+
+def orderUnusedLetters(dec, codes) -> np.ndarray:
+    # Cipher letters missing from the ciphertext cannot be scored; give them their plain letters
+    # in reverse order, the way generateCipherKey fills the end of a keyword alphabet
+    dec = np.array(dec, dtype=np.intp)
+    unused = np.flatnonzero(np.bincount(codes, minlength=26) == 0)
+    dec[unused] = np.sort(dec[unused])[::-1]
+    return dec
+
+def inferKeyword(dec):
+    # Shortest keyword whose generateCipherKey alphabet gives this key, or None
+    cipherAlphabet = [''] * 26
+    for cipher, plain in enumerate(dec):
+        cipherAlphabet[plain] = ALPHABET[cipher]
+    cipherAlphabet = ''.join(cipherAlphabet)
+    for length in range(21):
+        prefix = cipherAlphabet[:length]
+        rest = ''.join(char for char in reversed(ALPHABET) if char not in prefix)
+        if cipherAlphabet[length:] == rest:
+            return prefix or None
+    return None
+
+def keywordCandidates(text, minLength=4):
+    # Distinct keyword alphabets from the words of a text, first occurrence wins
+    seen = set()
+    candidates = []
+    for word in text.split():
+        word = ''.join(char for char in word if char.isascii() and char.isalpha())
+        if len(word) < minLength:
+            continue
+        cleaned = removeDuplicateCharacters(word)
+        if cleaned not in seen:
+            seen.add(cleaned)
+            candidates.append(cleaned)
+    return candidates
+
+def scoreKeywords(codes, table, keywords, batchSize=1024, budget=1 << 22):
+    # Scores every keyword alphabet against the ciphertext's quadgram histogram: each distinct
+    # quadgram is remapped per key and weighted by its count. The batch is cut down so the
+    # (keys, quadgrams, 4) gather stays under budget elements whatever the text length.
+    weights = ngrams.ngramWeights(N)
+    quadgrams, counts = np.unique(ngrams.ngramIndices(codes, N), return_counts=True)
+    letters = (quadgrams[:, None] // weights) % 26
+    batchSize = max(1, min(batchSize, budget // (len(quadgrams) * N)))
+    bestScore, bestKeyword = float('-inf'), None
+    for start in range(0, len(keywords), batchSize):
+        batch = keywords[start:start + batchSize]
+        decs = np.stack([keywordDecipherArray(keyword) for keyword in batch])
+        scores = table[decs[:, letters] @ weights] @ counts
+        best = int(np.argmax(scores))
+        if scores[best] > bestScore:
+            bestScore, bestKeyword = float(scores[best]), batch[best]
+    return bestScore, bestKeyword
+
+def runRestarts(codes, table, seeds, starts=()):
+    # One worker's share: climbs from each given starting key, then from a random key per seed
+    scorer = SwapScorer(codes, table)
+    best = (float('-inf'), None)
+    for index, seed in enumerate(seeds):
+        rng = random.Random(seed)
+        if index < len(starts):
+            dec = np.array(starts[index], dtype=np.intp)
+        else:
+            dec = np.array(rng.sample(range(26), 26), dtype=np.intp)
+        result = scorer.climb(dec, rng)
+        if result[0] > best[0]:
+            best = result
+    return best[0], best[1].tolist()
+
+def decipherKeyFromArray(dec) -> dict[str, str]:
+    return {ALPHABET[cipher]: ALPHABET[plain] for cipher, plain in enumerate(dec)}
+
+def crack(cipherText, table=None, restarts=8, workers=None, seed=None, keywords=()) -> CrackResult:
+    # Tries the keyword candidates, then hill-climbs from the best keyword key, the
+    # frequency-matched key and random keys, with restarts split across processes
+    if table is None:
+        table = ngrams.getTable(N)
+    codes = ngrams.letterCodes(cipherText)
+    if len(codes) < N:
+        raise ValueError("Ciphertext needs at least four letters")
+    if restarts < 1:
+        raise ValueError("Number of restarts must be positive")
+
+    starts = [frequencyKey(codes).tolist()]
+    keywordScore, keyword = scoreKeywords(codes, table, list(keywords)) if keywords else (float('-inf'), None)
+    if keyword is not None:
+        starts.insert(0, keywordDecipherArray(keyword).tolist())
+
+    seeds = [random.Random(seed).getrandbits(64) + i for i in range(max(restarts, len(starts)))]
+    bestScore, bestKey = search.runRestarts(runRestarts, (codes, table), seeds, starts, workers)
+    if keyword is not None and keywordScore >= bestScore - 1e-3:
+        bestScore, bestKey = keywordScore, keywordDecipherArray(keyword).tolist()
+
+    bestKey = orderUnusedLetters(bestKey, codes)
+    decipherKey = decipherKeyFromArray(bestKey)
+    plainText = translateMessage(cipherText, generateTranslationTable(decipherKey))
+    return CrackResult(bestScore, decipherKey, inferKeyword(bestKey), plainText)
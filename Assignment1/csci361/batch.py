@@ -0,0 +1,95 @@
+import glob
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Batch runner shared by the file CLIs: many (input, output) pairs in one process,
+# one key setup, work spread over a pool and per-file errors collected instead of exiting
+
+BatchResult = namedtuple('BatchResult', ['files', 'bytes', 'elapsed', 'failures'])
+
+def readManifest(manifestFile):
+    # One pair per line: "input<TAB>output", or "input output" when there is no tab.
+    # Blank lines and lines starting with '#' are skipped
+    jobs = []
+    baseDir = os.path.dirname(os.path.abspath(manifestFile))
+    with open(manifestFile, 'r', encoding='utf-8') as f:
+        for lineNumber, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split('\t') if '\t' in line else line.split(None, 1)
+            if len(parts) != 2:
+                raise ValueError(f"{manifestFile}:{lineNumber}: expected an input and an output path")
+            inputFile, outputFile = (os.path.join(baseDir, part.strip()) for part in parts)
+            jobs.append((inputFile, outputFile))
+    return jobs
+
+def sameFile(inputFile, outputFile):
+    # A missing input is not checked here; its job fails on its own when the batch runs
+    if not os.path.exists(inputFile):
+        return False
+    if os.path.exists(outputFile):
+        return os.path.samefile(inputFile, outputFile)
+    return os.path.realpath(inputFile) == os.path.realpath(outputFile)
+
+def checkJobs(jobs):
+    # An output that is its own input would be overwritten while it is still being read,
+    # and two jobs writing one output would leave whichever finished last
+    outputs = {}
+    for inputFile, outputFile in jobs:
+        if sameFile(inputFile, outputFile):
+            raise ValueError(f"Output {outputFile} is the same file as its input")
+        resolved = os.path.realpath(outputFile)
+        if resolved in outputs:
+            raise ValueError(f"Output {outputFile} is written by both {outputs[resolved]} and {inputFile}")
+        outputs[resolved] = inputFile
+    return jobs
+
+def collectJobs(source, outputDir=None):
+    # source is a directory (every regular file in it), a manifest file, or a glob pattern.
+    # Directory and glob inputs are written to outputDir under the same file name
+    if os.path.isfile(source):
+        return checkJobs(readManifest(source))
+
+    if os.path.isdir(source):
+        inputs = sorted(os.path.join(source, name) for name in os.listdir(source))
+    else:
+        inputs = sorted(glob.glob(source))
+    inputs = [path for path in inputs if os.path.isfile(path)]
+
+    if outputDir is None:
+        raise ValueError("An output directory is required for directory and glob batches")
+    os.makedirs(outputDir, exist_ok=True)
+    return checkJobs([(path, os.path.join(outputDir, os.path.basename(path))) for path in inputs])
+
+def runBatch(jobs, processFile, workers=None, useProcesses=False):
+    # processFile(inputFile, outputFile) returns the number of bytes processed and raises on failure.
+    # With useProcesses it must be picklable (a module-level function or a partial of one)
+    workers = workers or os.cpu_count() or 1
+    executorClass = ProcessPoolExecutor if useProcesses else ThreadPoolExecutor
+    totalBytes = 0
+    failures = []
+
+    startTime = time.perf_counter()
+    with executorClass(max_workers=workers) as pool:
+        futures = [(inputFile, pool.submit(processFile, inputFile, outputFile)) for inputFile, outputFile in jobs]
+        for inputFile, future in futures:
+            try:
+                totalBytes += future.result()
+            except Exception as e:
+                failures.append((inputFile, f"{type(e).__name__}: {e}"))
+
+    return BatchResult(len(jobs), totalBytes, time.perf_counter() - startTime, failures)
+
+def printSummary(result, file=sys.stdout):
+    succeeded = result.files - len(result.failures)
+    rate = result.bytes / result.elapsed / 1024 / 1024 if result.elapsed > 0 else 0.0
+    print(f"Batch complete: {succeeded}/{result.files} files, {result.bytes} bytes "
+          f"in {result.elapsed:.3f} seconds ({rate:.2f} MB/s)", file=file)
+    if result.failures:
+        print(f"{len(result.failures)} failure(s):", file=file)
+        for inputFile, message in result.failures:
+            print(f"  {inputFile}: {message}", file=file)
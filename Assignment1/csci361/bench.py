@@ -0,0 +1,98 @@
+import json
+import math
+import sys
+import time
+
+# Small timing harness shared by the benchmark scripts
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parseSize(text) -> int:
+    # '64K' -> 65536, '1G' -> 1073741824, plain numbers are bytes
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+def formatSize(size) -> str:
+    for unit in ('G', 'M', 'K'):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return str(size)
+
+def percentile(values, fraction):
+    # Nearest-rank percentile on a sorted copy
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def measure(function, warmup=1, repeat=5) -> list:
+    # Runs function warmup times untimed, then repeat timed runs; returns nanoseconds per run
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(repeat):
+        startTime = time.perf_counter_ns()
+        function()
+        timings.append(time.perf_counter_ns() - startTime)
+    return timings
+
+def resetPeakMemory() -> bool:
+    # Linux restarts the VmHWM high-water mark when 5 is written to clear_refs;
+    # elsewhere the peak stays the process-wide maximum
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peakMemory():
+    # Peak resident set size in bytes, or None where it cannot be read
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def summarize(timings, size) -> dict:
+    medianNs = percentile(timings, 0.5)
+    p95Ns = percentile(timings, 0.95)
+    return {
+        'runs': len(timings),
+        'medianNs': medianNs,
+        'p95Ns': p95Ns,
+        'medianMBps': size / 1024 / 1024 / (medianNs / 1e9) if medianNs else 0.0,
+        # Throughput of the slow tail: the p95 run time turned into MB/s
+        'p95MBps': size / 1024 / 1024 / (p95Ns / 1e9) if p95Ns else 0.0,
+    }
+
+def resultKey(result):
+    return (result['cipher'], result['operation'], result['size'])
+
+def compareResults(current, baseline, tolerance):
+    # Returns (result, baseline result) pairs whose median throughput dropped by more than tolerance
+    previous = {resultKey(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(resultKey(result))
+        if old and result['medianMBps'] < old['medianMBps'] * (1 - tolerance):
+            regressions.append((result, old))
+    return regressions
+
+def writeJson(filename, report):
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def readJson(filename):
+    with open(filename, 'r') as f:
+        return json.load(f)
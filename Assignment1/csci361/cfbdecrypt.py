@@ -0,0 +1,141 @@
+import math
+import os
+
+from csci361 import fileio, stats
+
+# CFB decryption without the serial chain. While decrypting, the shift register before
+# segment i is the last 64 bits of IV || ciphertext up to that segment, so every register
+# is known up front: they are rebuilt from the ciphertext, encrypted in one batch and the
+# top s bits of each result are XORed onto the ciphertext in bulk. Any range that starts on
+# a segment boundary can be decrypted on its own, so long inputs are split across processes.
+# encryptBlocks(v0, v1) is the batched block function (uint32 arrays in and out); it must be
+# picklable, e.g. a bound method of a cipher object, to be sent to worker processes.
+# NumPy and the process pool are imported where they are used so importing the modes stays cheap.
+
+# Fewer segments than this are cheaper to decrypt serially than to batch
+BATCH_SEGMENTS = 64
+# Segments per chunk; bounds the temporary arrays at about 64 bytes per segment
+CHUNK_SEGMENTS = 1 << 19
+
+def unitLength(feedbackBits) -> int:
+    # Smallest byte run holding whole segments; chunks start on multiples of it
+    return math.lcm(feedbackBits, 8) // 8
+
+def chunkLength(feedbackBits, limit=None) -> int:
+    unit = unitLength(feedbackBits)
+    size = CHUNK_SEGMENTS * feedbackBits // 8
+    if limit is not None:
+        size = min(size, limit)
+    return max(unit, size // unit * unit)
+
+def registerAt(register, data, offset) -> int:
+    # Shift register before the segment starting at byte offset of data
+    if offset == 0:
+        return register
+    return int.from_bytes((register.to_bytes(8, 'big') + bytes(data[max(0, offset - 8):offset]))[-8:], 'big')
+
+def decryptRange(encryptBlocks, data, register, feedbackBits) -> bytes:
+    # data starts on a segment boundary and register is the shift register before it
+    import numpy as np
+
+    length = len(data)
+    if length == 0:
+        return b''
+    count = -(-length * 8 // feedbackBits)
+    stream = np.empty(8 + length, dtype=np.uint8)
+    stream[:8] = np.frombuffer(register.to_bytes(8, 'big'), dtype=np.uint8)
+    stream[8:] = np.frombuffer(data, dtype=np.uint8)
+
+    # Register i is the 64 bits of stream starting at bit i * s
+    if feedbackBits % 8 == 0:
+        step = feedbackBits // 8
+        registers = np.lib.stride_tricks.sliding_window_view(stream, 8)[:length:step]
+    else:
+        bits = np.unpackbits(stream)
+        registers = np.packbits(np.lib.stride_tricks.sliding_window_view(bits, 64)[:length * 8:feedbackBits], axis=1)
+    words = np.ascontiguousarray(registers).view('>u4').astype(np.uint32)
+    v0, v1 = encryptBlocks(words[:, 0], words[:, 1])
+
+    blocks = np.empty((count, 2), dtype='>u4')
+    blocks[:, 0] = v0
+    blocks[:, 1] = v1
+    blocks = blocks.view(np.uint8).reshape(count, 8)
+    if feedbackBits % 8 == 0:
+        keystream = blocks[:, :step].reshape(-1)[:length]
+    else:
+        keystream = np.packbits(np.unpackbits(blocks, axis=1)[:, :feedbackBits].reshape(-1)[:length * 8])
+    return (stream[8:] ^ keystream).tobytes()
+
+def countWork(length, feedbackBits):
+    # Counted in the calling process, so work done by workers shows up in its stats
+    stats.count('teaBlocks', -(-length * 8 // feedbackBits))
+    stats.count('bytes', length)
+
+def decrypt(encryptBlocks, data, register, feedbackBits, workers=None, chunkSize=None) -> bytes:
+    countWork(len(data), feedbackBits)
+    chunk = chunkLength(feedbackBits, chunkSize)
+    workers = workers or os.cpu_count() or 1
+    offsets = range(0, len(data), chunk)
+    registers = [registerAt(register, data, offset) for offset in offsets]
+
+    if workers == 1 or len(offsets) <= 1:
+        result = bytearray(len(data))
+        for offset, chunkRegister in zip(offsets, registers):
+            result[offset:offset + chunk] = decryptRange(encryptBlocks, data[offset:offset + chunk], chunkRegister, feedbackBits)
+        return bytes(result)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(offsets))) as pool:
+        parts = pool.map(decryptRange, [encryptBlocks] * len(offsets),
+                         [bytes(data[offset:offset + chunk]) for offset in offsets],
+                         registers, [feedbackBits] * len(offsets))
+        return b''.join(parts)
+
+def decryptFileRange(encryptBlocks, iv, inputFile, outputFile, offset, length, feedbackBits) -> int:
+    # Worker: reads its range and the 8 ciphertext bytes before it, writes its plaintext in place
+    inFd = os.open(inputFile, os.O_RDONLY)
+    try:
+        previous = os.pread(inFd, min(8, offset), max(0, offset - 8))
+        data = os.pread(inFd, length, offset)
+    finally:
+        os.close(inFd)
+
+    register = int.from_bytes((iv + previous)[-8:], 'big')
+    outFd = os.open(outputFile, os.O_WRONLY)
+    try:
+        os.pwrite(outFd, decryptRange(encryptBlocks, data, register, feedbackBits), offset)
+    finally:
+        os.close(outFd)
+    return len(data)
+
+def decryptFile(encryptBlocks, iv, inputFile, outputFile, feedbackBits, workers=None, chunkSize=None) -> int:
+    # Each chunk is read and written by one worker, so memory stays at about one chunk per
+    # worker whatever the file size. Returns the number of bytes decrypted.
+    chunk = chunkLength(feedbackBits, chunkSize)
+    workers = workers or os.cpu_count() or 1
+    iv = bytes(iv)
+    size = os.path.getsize(inputFile)
+    offsets = range(0, size, chunk)
+    countWork(size, feedbackBits)
+
+    with fileio.atomicOutput(outputFile) as (fd, tempPath):
+        # Size the output up front so workers can write their ranges in any order
+        try:
+            os.ftruncate(fd, size)
+        finally:
+            os.close(fd)
+
+        if workers == 1 or len(offsets) <= 1:
+            for offset in offsets:
+                decryptFileRange(encryptBlocks, iv, inputFile, tempPath, offset, min(chunk, size - offset), feedbackBits)
+            return size
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(offsets))) as pool:
+            futures = [pool.submit(decryptFileRange, encryptBlocks, iv, inputFile, tempPath,
+                                   offset, min(chunk, size - offset), feedbackBits) for offset in offsets]
+            for future in futures:
+                future.result()
+    return size
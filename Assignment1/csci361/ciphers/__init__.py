@@ -0,0 +1,38 @@
+# Importable cipher engines behind the Assignment 1 scripts.
+# Names are resolved on first access, so importing the package stays cheap and
+# NumPy is only loaded once a vectorised path actually runs.
+
+import importlib
+
+EXPORTS = {
+    'CipherError': 'errors',
+    'InvalidKeyError': 'errors',
+    'InvalidInputError': 'errors',
+    'KeywordCipher': 'substitution',
+    'KamaSutraCipher': 'kamasutra',
+    'FibonacciStreamCipher': 'fibonacci',
+    'TEA': 'tea',
+    'FirstWordTEA': 'tea',
+    'XTEA': 'tea',
+    'XXTEA': 'tea',
+    'CFB': 'cfb',
+    'TEA_CFB': 'cfb',
+    'CTR': 'ctr',
+    'CFBReader': 'seekable',
+    'CTRReader': 'seekable',
+    'SynchronousCipher': 'synchronous',
+    'PeriodicKeystream': 'synchronous',
+    'CombinationCipher': 'combination',
+}
+
+__all__ = list(EXPORTS)
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
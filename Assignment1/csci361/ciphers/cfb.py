@@ -0,0 +1,311 @@
+import math
+import mmap
+import os
+
+from csci361 import cfbdecrypt, fileio, stats
+from csci361.ciphers.errors import InvalidInputError
+from csci361.ciphers.tea import checkedBlocks, keyWords
+
+# Cipher feedback modes over TEA.
+# CFB is the Task 7 one-bit mode on any cipher with encryptRegister/encryptRegisters;
+# TEA_CFB is the Task 5 s-bit mode with its own TEA round function.
+
+class CFB:
+    def __init__(self, cipher, iv, workers=None):
+        self.cipher = cipher
+        self.iv = iv
+        self.blockSize = 8
+        # Processes used to decrypt long inputs (default: CPU count)
+        self.workers = workers
+
+    def crypt_bits(self, bits, register, decrypt):
+        # 1-bit CFB over a sequence of bits with the register held as one 64-bit int
+        if decrypt and len(bits) >= cfbdecrypt.BATCH_SEGMENTS:
+            return self.batch_decrypt_bits(bits, register)
+
+        encryptRegister = self.cipher.encryptRegister
+        result = []
+        stats.count('teaBlocks', len(bits))
+
+        for bit in bits:
+            outBit = bit ^ (encryptRegister(register) >> 63)
+            register = ((register << 1) | (bit if decrypt else outBit)) & 0xFFFFFFFFFFFFFFFF
+            result.append(outBit)
+
+        return result, register
+
+    def batch_decrypt_bits(self, bits, register):
+        # When decrypting, every register state is the IV followed by the ciphertext seen so far,
+        # so the bits are packed and decrypted as 1-bit segments by cfbdecrypt.
+        # Zero bits padding the last byte only add segments after the real ones.
+        import numpy as np
+
+        count = len(bits)
+        packed = np.packbits(np.asarray(bits, dtype=np.uint8))
+        plain = cfbdecrypt.decrypt(self.cipher.encryptRegisters, packed.tobytes(), register, 1, self.workers)
+        result = np.unpackbits(np.frombuffer(plain, dtype=np.uint8))[:count].tolist()
+
+        # Called with at least 64 bits, so the final register is the last 64 of them
+        finalRegister = int.from_bytes(np.packbits(np.asarray(bits[-64:], dtype=np.uint8)).tobytes(), 'big')
+        return result, finalRegister
+
+    def encrypt_bits(self, bits, register=None):
+        if register is None:
+            register = int.from_bytes(self.iv, 'big')
+        return self.crypt_bits(bits, register, False)
+
+    def decrypt_bits(self, bits, register=None):
+        if register is None:
+            register = int.from_bytes(self.iv, 'big')
+        return self.crypt_bits(bits, register, True)
+
+    def crypt_bytes(self, data, register, decrypt):
+        if decrypt and len(data) * 8 >= cfbdecrypt.BATCH_SEGMENTS:
+            plain = cfbdecrypt.decrypt(self.cipher.encryptRegisters, data, register, 1, self.workers)
+            return plain, cfbdecrypt.registerAt(register, data, len(data))
+
+        bits = [(byte >> (7 - position)) & 1 for byte in data for position in range(8)]
+        outBits, register = self.crypt_bits(bits, register, decrypt)
+
+        result = bytearray(len(data))
+        for i in range(len(data)):
+            value = 0
+            for bit in outBits[i * 8:i * 8 + 8]:
+                value = (value << 1) | bit
+            result[i] = value
+        return bytes(result), register
+
+    def encrypt_bytes(self, data, register=None):
+        if register is None:
+            register = int.from_bytes(self.iv, 'big')
+        return self.crypt_bytes(data, register, False)
+
+    def decrypt_bytes(self, data, register=None):
+        if register is None:
+            register = int.from_bytes(self.iv, 'big')
+        return self.crypt_bytes(data, register, True)
+
+    def openReader(self, source):
+        # Seekable plaintext view of a ciphertext file; each byte is 8 one-bit segments
+        from csci361.ciphers.seekable import CFBReader
+        return CFBReader(source, self.iv, lambda data, register: self.decrypt_bytes(data, register)[0], 1)
+
+    def encrypt(self, plainText, shiftRegister):
+        # Single-bit step on a bytes register, kept for callers of the original API
+        (ciphertext,), register = self.encrypt_bits((plainText,), int.from_bytes(shiftRegister, 'big'))
+        return ciphertext, register.to_bytes(8, 'big')
+
+    def decrypt(self, cipherText, shiftRegister):
+        (plaintext,), register = self.decrypt_bits((cipherText,), int.from_bytes(shiftRegister, 'big'))
+        return plaintext, register.to_bytes(8, 'big')
+
+# Bytes mapped at a time by the TEA_CFB file API
+WINDOW_SIZE = 16 * 1024 * 1024
+
+class TEA_CFB:
+    def __init__(self, key):
+        self.key = keyWords(key)
+        self.delta = 0x9e3779b9
+
+    def TEA_encrypt(self, v0, v1):
+        sumValue = 0
+
+        for i in range(32):
+            sumValue = (sumValue + self.delta) & 0xffffffff
+            v0 = (v0 + (((v1 << 4) + self.key[0]) ^ (v1 + sumValue) ^ ((v1 >> 5) + self.key[1]))) & 0xffffffff
+            v1 = (v1 + (((v0 << 4) + self.key[2]) ^ (v0 + sumValue) ^ ((v0 >> 5) + self.key[3]))) & 0xffffffff
+
+        return v0, v1
+
+    def TEA_encryptBlocks(self, v0, v1):
+        # v0 and v1 are sequences of 32-bit words, one pair per block
+        from csci361 import teabatch
+        return teabatch.encryptBlocks(v0, v1, self.key)
+
+    def TEA_decryptBlocks(self, v0, v1):
+        from csci361 import teabatch
+        return teabatch.decryptBlocks(v0, v1, self.key)
+
+    def encryptBlocks(self, data):
+        from csci361 import teabatch
+        v0, v1 = checkedBlocks(data)
+        return teabatch.blocksToBytes(*self.TEA_encryptBlocks(v0, v1))
+
+    def decryptBlocks(self, data):
+        from csci361 import teabatch
+        v0, v1 = checkedBlocks(data)
+        return teabatch.blocksToBytes(*self.TEA_decryptBlocks(v0, v1))
+
+    def bytesToBits(self, data):
+        bits = []
+        for byte in data:
+            for i in range(8):
+                bits.append((byte >> (7-i)) & i)
+        return bits
+
+    def bitsToBytes(self, bits):
+        while len(bits) % 8 != 0:
+            bits.append(0)
+
+        result = bytearray()
+        for i in range(0, len(bits), 8):
+            byteValue = 0
+            for j in range(8):
+                if i + j < len(bits):
+                    byteValue = (bits[i + j] << ( 7 - j))
+            result.append(byteValue)
+
+        return bytes(result)
+    
+    def shiftRegisterLeft(self, register, newBits, feedbackSize):
+        register = register[feedbackSize:] + newBits
+        return register 
+
+    def checkParameters(self, iv, feedbackBits):
+        if len(iv) != 8:
+            raise InvalidInputError("IV must be exactly 8 bytes (64 bits)")
+        if not 1 <= feedbackBits <= 64:
+            raise InvalidInputError("Feedback bits must be between 1 and 64")
+
+    def segmentCFBInto(self, data, out, shiftRegister, feedbackBits, encrypting):
+        # s-bit CFB: each TEA call gives the top s bits of E(register) as keystream,
+        # then the s ciphertext bits are shifted into the register.
+        # The last segment is shorter when 8 * len(data) is not a multiple of s.
+        # Writes len(data) bytes into the buffer out and returns the final shift register,
+        # so data can be any buffer (memoryview, mmap slice) and long inputs can be split
+        # at multiples of s bytes.
+        inBuffer = inBits = 0
+        outBuffer = outBits = 0
+        position = written = 0
+        remaining = len(data) * 8
+
+        while remaining > 0:
+            size = min(feedbackBits, remaining)
+
+            while inBits < size:
+                inBuffer = (inBuffer << 8) | data[position]
+                position += 1
+                inBits += 8
+            inBits -= size
+            segment = inBuffer >> inBits
+            inBuffer &= (1 << inBits) - 1
+
+            encryptedV0, encryptedV1 = self.TEA_encrypt(shiftRegister >> 32, shiftRegister & 0xffffffff)
+            keystream = ((encryptedV0 << 32) | encryptedV1) >> (64 - size)
+
+            outSegment = segment ^ keystream
+            cipherSegment = outSegment if encrypting else segment
+            shiftRegister = ((shiftRegister << size) | cipherSegment) & 0xffffffffffffffff
+
+            outBuffer = (outBuffer << size) | outSegment
+            outBits += size
+            while outBits >= 8:
+                outBits -= 8
+                out[written] = outBuffer >> outBits
+                written += 1
+                outBuffer &= (1 << outBits) - 1
+
+            remaining -= size
+
+        return shiftRegister
+
+    def segmentCFB(self, data, iv, feedbackBits, encrypting):
+        result = bytearray(len(data))
+        self.segmentCFBInto(data, memoryview(result), int.from_bytes(iv, 'big'), feedbackBits, encrypting)
+        return bytes(result)
+
+    def blockCFBInto(self, data, out, shiftRegister, encrypting):
+        # CFB-64 fast path: one TEA call per whole 8-byte block; same buffer contract as segmentCFBInto
+        for offset in range(0, len(data), 8):
+            block = data[offset:offset + 8]
+            size = len(block) * 8
+
+            encryptedV0, encryptedV1 = self.TEA_encrypt(shiftRegister >> 32, shiftRegister & 0xffffffff)
+            keystream = ((encryptedV0 << 32) | encryptedV1) >> (64 - size)
+
+            inBlock = int.from_bytes(block, 'big')
+            outBlock = inBlock ^ keystream
+            shiftRegister = outBlock if encrypting else inBlock
+
+            out[offset:offset + len(block)] = outBlock.to_bytes(len(block), 'big')
+
+        return shiftRegister
+
+    def blockCFB(self, data, iv, encrypting):
+        result = bytearray(len(data))
+        self.blockCFBInto(data, memoryview(result), int.from_bytes(iv, 'big'), encrypting)
+        return bytes(result)
+
+    def cryptInto(self, data, out, shiftRegister, feedbackBits, encrypting):
+        stats.count('teaBlocks', -(-len(data) * 8 // feedbackBits))
+        stats.count('bytes', len(data))
+        if feedbackBits == 64:
+            return self.blockCFBInto(data, out, shiftRegister, encrypting)
+        return self.segmentCFBInto(data, out, shiftRegister, feedbackBits, encrypting)
+
+    def decryptFrom(self, data, shiftRegister, feedbackBits, workers=None) -> bytes:
+        # Decrypts data starting on a segment boundary. Short inputs take the serial path;
+        # longer ones rebuild every register from the ciphertext and go through cfbdecrypt.
+        if len(data) * 8 < cfbdecrypt.BATCH_SEGMENTS * feedbackBits:
+            result = bytearray(len(data))
+            self.cryptInto(data, memoryview(result), shiftRegister, feedbackBits, False)
+            return bytes(result)
+        return cfbdecrypt.decrypt(self.TEA_encryptBlocks, data, shiftRegister, feedbackBits, workers)
+
+    def openReader(self, source, iv, feedbackBits):
+        # Seekable plaintext view of a ciphertext file. Segments start on a byte every
+        # lcm(s, 8) bits, which is where a read can pick up the shift register.
+        from csci361.ciphers.seekable import CFBReader
+        self.checkParameters(iv, feedbackBits)
+        return CFBReader(source, iv, lambda data, shiftRegister: self.decryptFrom(data, shiftRegister, feedbackBits, 1),
+                         cfbdecrypt.unitLength(feedbackBits))
+
+    def windowLength(self, feedbackBits, windowSize):
+        # Windows start on mmap offsets and end on segment boundaries, so the shift
+        # register carried from one window to the next is all the state there is
+        step = math.lcm(mmap.ALLOCATIONGRANULARITY, feedbackBits)
+        return max(step, windowSize // step * step)
+
+    def cryptFile(self, inputFile, outputFile, iv, feedbackBits, encrypting, windowSize=WINDOW_SIZE) -> int:
+        # The input and a preallocated output of the same length are mapped one window at a time
+        # and processed through memoryview slices, so memory use stays at about two windows
+        # whatever the file size. Returns the number of bytes processed.
+        self.checkParameters(iv, feedbackBits)
+        window = self.windowLength(feedbackBits, windowSize)
+        shiftRegister = int.from_bytes(iv, 'big')
+
+        with open(inputFile, 'rb') as source, fileio.atomicOutput(outputFile) as (fd, tempPath):
+            with os.fdopen(fd, 'r+b') as destination:
+                size = os.fstat(source.fileno()).st_size
+                destination.truncate(size)
+                for offset in range(0, size, window):
+                    length = min(window, size - offset)
+                    with mmap.mmap(source.fileno(), length, offset=offset, access=mmap.ACCESS_READ) as inMap, \
+                            mmap.mmap(destination.fileno(), length, offset=offset, access=mmap.ACCESS_WRITE) as outMap:
+                        with memoryview(inMap) as data, memoryview(outMap) as out:
+                            shiftRegister = self.cryptInto(data, out, shiftRegister, feedbackBits, encrypting)
+                        outMap.flush()
+        return size
+
+    def encryptFile(self, inputFile, outputFile, iv, feedbackBits, windowSize=WINDOW_SIZE) -> int:
+        return self.cryptFile(inputFile, outputFile, iv, feedbackBits, True, windowSize)
+
+    def decryptFile(self, inputFile, outputFile, iv, feedbackBits, windowSize=WINDOW_SIZE, workers=None) -> int:
+        # Decryption is not serial, so the file is split into chunks of at most windowSize
+        # bytes that worker processes decrypt side by side
+        self.checkParameters(iv, feedbackBits)
+        return cfbdecrypt.decryptFile(self.TEA_encryptBlocks, iv, inputFile, outputFile, feedbackBits, workers, windowSize)
+
+    def encryption(self, plainText, iv, feedbackBits):
+        self.checkParameters(iv, feedbackBits)
+
+        if isinstance(plainText, str):
+            plainText = plainText.encode('utf-8')
+
+        result = bytearray(len(plainText))
+        self.cryptInto(plainText, memoryview(result), int.from_bytes(iv, 'big'), feedbackBits, True)
+        return bytes(result)
+
+    def decryption(self, cipherText, iv, feedbackBits, workers=None):
+        self.checkParameters(iv, feedbackBits)
+        return self.decryptFrom(cipherText, int.from_bytes(iv, 'big'), feedbackBits, workers)
@@ -0,0 +1,33 @@
+from csci361 import teactr
+from csci361.ciphers.errors import InvalidInputError
+
+class CTR:
+    # Counter mode over any 64-bit TEA-family cipher: keystream block i depends only on
+    # (nonce, i), so large inputs are split by block range across worker processes
+    def __init__(self, cipher, nonce, workers=None, chunkSize=teactr.DEFAULT_CHUNK_SIZE):
+        if len(nonce) != 8:
+            raise InvalidInputError("Nonce must be 8 bytes")
+        teactr.checkChunkSize(chunkSize)
+        self.cipher = cipher
+        self.nonce = nonce
+        self.workers = workers
+        self.chunkSize = chunkSize
+
+    def encrypt(self, plainText):
+        return teactr.crypt(self.cipher.key, self.nonce, plainText, self.workers, self.chunkSize, self.cipher.algorithm)
+
+    def decrypt(self, cipherText):
+        return teactr.crypt(self.cipher.key, self.nonce, cipherText, self.workers, self.chunkSize, self.cipher.algorithm)
+
+    def encryptFile(self, inputFile, outputFile):
+        return teactr.cryptFile(self.cipher.key, self.nonce, inputFile, outputFile, self.workers, self.chunkSize,
+                                self.cipher.algorithm)
+
+    def decryptFile(self, inputFile, outputFile):
+        return teactr.cryptFile(self.cipher.key, self.nonce, inputFile, outputFile, self.workers, self.chunkSize,
+                                self.cipher.algorithm)
+
+    def openReader(self, source):
+        # Seekable plaintext view of a ciphertext file; block i's keystream is E(nonce + i)
+        from csci361.ciphers.seekable import CTRReader
+        return CTRReader(source, self.cipher.key, self.nonce, self.cipher.algorithm)
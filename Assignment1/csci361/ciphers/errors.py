@@ -0,0 +1,11 @@
+# Exceptions raised by the cipher library. Both subclass ValueError so callers that
+# caught the ValueErrors raised by the original scripts keep working
+
+class CipherError(Exception):
+    pass
+
+class InvalidKeyError(CipherError, ValueError):
+    pass
+
+class InvalidInputError(CipherError, ValueError):
+    pass
@@ -0,0 +1,76 @@
+from functools import lru_cache
+from itertools import cycle, islice
+
+# Fibonacci stream cipher (Assignment 1 Task 6): k_i = k_{i-1} + k_{i-2} mod 26,
+# added to each letter after spaces are removed and the text is upper-cased.
+# NumPy is imported inside encryption/decryption so importing this module stays cheap.
+
+def characterToNumber(char):
+    return ord(char) - ord('A')
+
+def numberToCharacter(number):
+    return chr((number % 26) + ord('A'))
+
+@lru_cache(maxsize=None)
+def keyStreamPeriod(k0, k1):
+    # k_i = k_{i-1} + k_{i-2} mod 26 is purely periodic (the Pisano period for 26 is 84),
+    # so one period per seed pair is enough to produce any part of the stream
+    k0, k1 = k0 % 26, k1 % 26
+    period = [k0, k1]
+    while True:
+        nextKey = (period[-1] + period[-2]) % 26
+        if period[-1] == k0 and nextKey == k1 and len(period) > 2:
+            period.pop()
+            return tuple(period)
+        period.append(nextKey)
+
+def fibonacciPair(n):
+    # Fast doubling: returns (F(n), F(n+1)) mod 26 in O(log n) steps
+    if n == 0:
+        return 0, 1
+    a, b = fibonacciPair(n >> 1)
+    c = (a * (2 * b - a)) % 26
+    d = (a * a + b * b) % 26
+    if n & 1:
+        return d, (c + d) % 26
+    return c, d
+
+def keyAt(k0, k1, i):
+    # k_i = k0 * F(i-1) + k1 * F(i), with F(i-1) = F(i+1) - F(i)
+    fi, fNext = fibonacciPair(i)
+    return (k0 * (fNext - fi) + k1 * fi) % 26
+
+def iterKeyStream(k0, k1, offset=0):
+    period = keyStreamPeriod(k0, k1)
+    return islice(cycle(period), offset % len(period), None)
+
+def generateKeyStream(k0,  k1, length):
+    return list(islice(iterKeyStream(k0, k1), max(length, 2)))
+
+def encryption(plainText, k0, k1, offset=0):
+    # offset is the position of the first letter in the stream, so long inputs
+    # can be encrypted in chunks without keeping the keystream in memory
+    from csci361 import textcodes
+    values = textcodes.foldText(plainText)
+    key = textcodes.tileKeystream(keyStreamPeriod(k0, k1), offset, len(values))
+    return textcodes.decodeText(textcodes.shiftAll(values, key))
+
+def decryption(cipherText, k0, k1, offset=0):
+    from csci361 import textcodes
+    values = textcodes.foldText(cipherText)
+    key = textcodes.tileKeystream(keyStreamPeriod(k0, k1), offset, len(values))
+    return textcodes.decodeText(textcodes.shiftAll(values, key, decrypt=True))
+
+class FibonacciStreamCipher:
+    def __init__(self, k0, k1):
+        self.k0 = k0
+        self.k1 = k1
+
+    def keyAt(self, index):
+        return keyAt(self.k0, self.k1, index)
+
+    def encrypt(self, plainText, offset=0):
+        return encryption(plainText, self.k0, self.k1, offset)
+
+    def decrypt(self, cipherText, offset=0):
+        return decryption(cipherText, self.k0, self.k1, offset)
@@ -0,0 +1,154 @@
+import mmap
+import os
+from collections import namedtuple
+
+from csci361 import fileio, keycache, stats
+
+# Kama-Sutra cipher (Assignment 1 Task 4). The key pairs its first and last letters,
+# second and second-to-last and so on; each pair swaps, and 'f'/'u' are never substituted.
+
+# Characters per read in the text path, bytes per slice in the mmap path
+BLOCK_SIZE = 4 * 1024 * 1024
+
+DEFAULT_KEY = "abcdefghijklmnopqrstuvwxyz"
+
+def writeKeyfile(keyfile, key=DEFAULT_KEY):
+    with open(keyfile, 'w') as f:
+        f.write(key + "\n")
+
+def readKeyfile(keyfile):
+    # The key is the first line of the keyfile
+    with open(keyfile, 'r') as f:
+        return f.readline().strip()
+
+def createCipherMapping(key):
+    cipherMap = {}
+    keyLength = len(key)
+    
+    for i in range(keyLength // 2):
+        first = key[i].lower()
+        second = key[keyLength - 1 - i].lower()
+        
+        if 'a' <= first <= 'z' and 'a' <= second <= 'z':
+            cipherMap[first] = second
+            cipherMap[second] = first
+    
+    # Handle middle character for odd-length keys (maps to itself)
+    if keyLength % 2 == 1:
+        middle_char = key[keyLength // 2].lower()
+        if 'a' <= middle_char <= 'z':
+            cipherMap[middle_char] = middle_char
+
+    return cipherMap
+
+# Uppercase letters whose lower() is not a plain case swap; the old loop rewrote these too
+EXTRA_LETTERS = "\u0130\u03f4\u1e9e\u2126\u212a\u212b"
+
+def mapCharacter(char, cipherMapping):
+    # f and u are never substituted
+    if char == 'f' or char == 'F' or char == 'u' or char == 'U':
+        return char
+    elif char.islower():
+        return cipherMapping.get(char, char)
+    elif char.isupper():
+        lowerChar = char.lower()
+        mappedChar = cipherMapping.get(lowerChar, lowerChar)
+        return mappedChar.upper()
+    return char
+
+def createTranslationTable(cipherMapping):
+    # Compile the mapping once into a str.translate table that keeps case
+    letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ" + EXTRA_LETTERS
+    return {ord(char): mapCharacter(char, cipherMapping) for char in letters}
+
+def createByteTable(cipherMapping):
+    # 256-byte bytes.translate table for binary-safe input
+    table = bytearray(range(256))
+    for char in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        table[ord(char)] = ord(mapCharacter(char, cipherMapping))
+    return bytes(table)
+
+CompiledKey = namedtuple('CompiledKey', ['cipherMapping', 'table', 'byteTable'])
+
+def compileKey(key):
+    # Mapping and both translate tables for a key, built once per process
+    def build():
+        cipherMapping = createCipherMapping(key)
+        return CompiledKey(cipherMapping, createTranslationTable(cipherMapping), createByteTable(cipherMapping))
+    return keycache.cached(('kamasutra', key), build)
+
+def loadKeyfile(keyfile):
+    # Cached on path plus mtime, so the keyfile is only read again after it changes
+    cacheKey = keycache.fileCacheKey('kamasutra-keyfile', keyfile)
+    return keycache.cached(cacheKey, lambda: compileKey(readKeyfile(keyfile)))
+
+def transformBlocks(in_file, out_file, table, blockSize=BLOCK_SIZE):
+    while True:
+        with stats.phase('read'):
+            block = in_file.read(blockSize)
+        if not block:
+            break
+        with stats.phase('transform'):
+            block = block.translate(table)
+        with stats.phase('write'):
+            out_file.write(block)
+        # Counted in encoded bytes, the same unit as the --mmap path
+        stats.count('bytes', len(block) if block.isascii() else len(block.encode(out_file.encoding, 'replace')))
+
+def transformMapped(in_file, out_file, byteTable, blockSize=BLOCK_SIZE):
+    # Input is treated as raw bytes: ASCII letters are mapped, every other byte is copied
+    size = os.fstat(in_file.fileno()).st_size
+    if size == 0:
+        return
+    with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(0, size, blockSize):
+            # Slicing the map is where its pages are read in
+            with stats.phase('read'):
+                block = mapped[offset:offset + blockSize]
+            with stats.phase('transform'):
+                block = block.translate(byteTable)
+            with stats.phase('write'):
+                out_file.write(block)
+    stats.count('bytes', size)
+
+def transformFile(in_file, outputFile, compiledKey, useMmap=False, blockSize=BLOCK_SIZE):
+    with fileio.atomicOutput(outputFile) as (fd, tempPath):
+        if useMmap:
+            with os.fdopen(fd, 'wb') as out_file:
+                transformMapped(in_file, out_file, compiledKey.byteTable, blockSize)
+        else:
+            with os.fdopen(fd, 'w') as out_file:
+                transformBlocks(in_file, out_file, compiledKey.table, blockSize)
+
+def toCompiledKey(key):
+    # encryption/decryption accept a key string or an already compiled key
+    return key if isinstance(key, CompiledKey) else compileKey(key)
+
+def transformPath(compiledKey, useMmap, inputFile, outputFile):
+    # Batch worker: raises instead of exiting so the batch can collect per-file errors
+    with open(inputFile, 'rb' if useMmap else 'r') as in_file:
+        transformFile(in_file, outputFile, compiledKey, useMmap)
+    return os.path.getsize(inputFile)
+
+class KamaSutraCipher:
+    def __init__(self, key=DEFAULT_KEY):
+        self.compiledKey = toCompiledKey(key)
+
+    @classmethod
+    def fromKeyfile(cls, keyfile):
+        return cls(loadKeyfile(keyfile))
+
+    def encrypt(self, text):
+        # str uses the full table; bytes map ASCII letters and copy every other byte
+        table = self.compiledKey.byteTable if isinstance(text, (bytes, bytearray)) else self.compiledKey.table
+        return text.translate(table)
+
+    def decrypt(self, text):
+        # The pairing is its own inverse
+        return self.encrypt(text)
+
+    def encryptFile(self, inputFile, outputFile, useMmap=False):
+        return transformPath(self.compiledKey, useMmap, inputFile, outputFile)
+
+    def decryptFile(self, inputFile, outputFile, useMmap=False):
+        return transformPath(self.compiledKey, useMmap, inputFile, outputFile)
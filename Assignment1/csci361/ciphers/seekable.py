@@ -0,0 +1,106 @@
+import abc
+import io
+import os
+
+from csci361 import teactr
+
+# Read-only file objects over TEA stream-mode ciphertext that decrypt any byte range
+# without starting from the IV. In CFB decryption the shift register is always the last
+# 64 bits of IV || ciphertext, so it is rebuilt from the 8 bytes before the first whole
+# segment of the range; CTR keystream blocks are computed straight from their index.
+# A read of n bytes costs O(n) wherever it lands in the file.
+
+class SeekableDecryptor(io.RawIOBase):
+    def __new__(cls, *args, **kwargs):
+        # The C io base allocates without the ABC check object.__new__ makes, so do it here
+        if cls.__abstractmethods__:
+            raise TypeError(f"Can't instantiate abstract class {cls.__name__} without an implementation "
+                            f"for {', '.join(sorted(cls.__abstractmethods__))}")
+        return super().__new__(cls)
+
+    def __init__(self, source):
+        # source is a binary file object, or a path that the reader opens and closes
+        if isinstance(source, (str, bytes, os.PathLike)):
+            self.raw = open(source, 'rb')
+            self.ownsRaw = True
+        else:
+            self.raw = source
+            self.ownsRaw = False
+        self.size = self.raw.seek(0, io.SEEK_END)
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self.position = position
+        return position
+
+    def readinto(self, buffer):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        length = min(len(buffer), max(0, self.size - self.position))
+        if length == 0:
+            return 0
+        buffer[:length] = self.decryptRange(self.position, length)
+        self.position += length
+        return length
+
+    def readCipher(self, offset, length):
+        self.raw.seek(offset)
+        return self.raw.read(length)
+
+    @abc.abstractmethod
+    def decryptRange(self, offset, length):
+        pass
+
+    def close(self):
+        if not self.closed and self.ownsRaw:
+            self.raw.close()
+        super().close()
+
+class CFBReader(SeekableDecryptor):
+    # decrypt(data, register) decrypts data that starts on a segment boundary with the
+    # given 64-bit shift register; unit is the smallest byte run holding whole segments
+    def __init__(self, source, iv, decrypt, unit):
+        super().__init__(source)
+        self.iv = bytes(iv)
+        self.decrypt = decrypt
+        self.unit = unit
+
+    def decryptRange(self, offset, length):
+        start = offset // self.unit * self.unit
+        previous = self.readCipher(max(0, start - 8), min(8, start))
+        register = int.from_bytes((self.iv + previous)[-8:], 'big')
+        plainText = self.decrypt(self.readCipher(start, offset + length - start), register)
+        return plainText[offset - start:]
+
+class CTRReader(SeekableDecryptor):
+    def __init__(self, source, key, nonce, algorithm='tea'):
+        super().__init__(source)
+        self.key = teactr.keyTuple(key)
+        self.nonce = nonce
+        self.algorithm = algorithm
+
+    def decryptRange(self, offset, length):
+        start = offset // 8 * 8
+        teactr.countWork(offset + length - start)
+        plainText = teactr.cryptRange(self.key, self.nonce, self.readCipher(start, offset + length - start), start // 8,
+                                      self.algorithm)
+        return plainText[offset - start:]
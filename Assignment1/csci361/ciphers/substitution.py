@@ -0,0 +1,135 @@
+import os
+from collections import namedtuple
+
+from csci361 import fileio, keycache, stats
+from csci361.ciphers.errors import InvalidKeyError
+
+# Keyword substitution cipher (Assignment 1 Task 2). The keyword, without repeated letters,
+# starts the cipher alphabet and the unused letters follow in reverse order.
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+def removeDuplicateCharacters(keyword:str) -> str:
+    seenChars = set()
+    result = []
+    for char in keyword.upper():
+        if char not in seenChars and char.isalpha():
+            seenChars.add(char)
+            result.append(char)
+    return ''.join(result)
+
+def validateKeyword(keyword:str) -> str:
+    if not keyword:
+        return False
+    return all(char.isalpha() for char in keyword)
+
+def generateCipherKey(keyword:str) -> dict[str, str]:
+    cleanedKeyword = removeDuplicateCharacters(keyword)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+    remainingChars = []
+    for char in reversed(alphabet):
+        if char not in cleanedKeyword:
+            remainingChars.append(char)
+    
+    cipherAlphabet = cleanedKeyword + ''.join(remainingChars)
+    cipherKey = {}
+    for i, char in enumerate(alphabet):
+        cipherKey[char] = cipherAlphabet[i]
+    
+    return cipherKey
+
+def generateDecipherKey(cipherKey: dict[str, str]) -> dict[str, str]:
+    return {v: k for k, v in cipherKey.items()}
+
+# Letters whose upper() is an ASCII letter, so substituteCharacter maps them as well
+EXTRA_LETTERS = "\u0131\u017f"
+
+def substituteCharacter(char: str, key: dict[str, str]) -> str:
+    if char.upper() in key:
+        #Preserve case
+        if char.isupper():
+            return key[char.upper()]
+        return key[char.upper()].lower()
+    #Keep non alphabethic characters
+    return char
+
+def generateTranslationTable(key: dict[str, str]) -> dict[int, str]:
+    # Compile the key once into a str.translate table that keeps case
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz" + EXTRA_LETTERS
+    return {ord(char): substituteCharacter(char, key) for char in letters}
+
+def generateByteTable(key: dict[str, str]) -> bytes:
+    # 256-byte bytes.translate table for binary-safe input; non ASCII letters pass through
+    table = bytearray(range(256))
+    for char in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz":
+        table[ord(char)] = ord(substituteCharacter(char, key))
+    return bytes(table)
+
+def translateMessage(message, table):
+    # message and table are either str and a translation table or bytes and a byte table
+    return message.translate(table)
+
+CompiledKeyword = namedtuple('CompiledKeyword', ['cipherKey', 'decipherKey', 'encryptTable', 'decryptTable',
+                                                 'encryptBytes', 'decryptBytes'])
+
+def compileKeyword(keyword:str) -> CompiledKeyword:
+    # Builds every table for a keyword once; later calls with the same keyword hit the process-wide cache
+    def build():
+        cipherKey = generateCipherKey(keyword)
+        decipherKey = generateDecipherKey(cipherKey)
+        return CompiledKeyword(cipherKey, decipherKey,
+                               generateTranslationTable(cipherKey), generateTranslationTable(decipherKey),
+                               generateByteTable(cipherKey), generateByteTable(decipherKey))
+    return keycache.cached(('task2', removeDuplicateCharacters(keyword)), build)
+
+def encryptMessage(message: str, cipherKey: dict[str, str]) -> str:
+    return translateMessage(message, generateTranslationTable(cipherKey))
+
+def decryptMessage(cipherText:str, decipherKey: dict[str, str]) -> str:
+    return translateMessage(cipherText, generateTranslationTable(decipherKey))
+
+def copyTransformed(source, destination, transform, chunkSize:int = DEFAULT_CHUNK_SIZE) -> int:
+    bytesProcessed = 0
+    while True:
+        with stats.phase('read'):
+            chunk = source.read(chunkSize)
+        if not chunk:
+            break
+        with stats.phase('transform'):
+            result = transform(chunk)
+        with stats.phase('write'):
+            destination.write(result)
+        bytesProcessed += len(chunk) if chunk.isascii() else len(chunk.encode('utf-8'))
+    with stats.phase('write'):
+        destination.flush()
+    stats.count('bytes', bytesProcessed)
+    return bytesProcessed
+
+def translateFile(table, inputFile:str, outputFile:str, chunkSize:int = DEFAULT_CHUNK_SIZE) -> int:
+    # Batch worker: raises on failure instead of exiting so one bad file does not stop the batch
+    with open(inputFile, 'r', encoding='utf-8') as source, fileio.atomicOutput(outputFile) as (fd, tempPath):
+        with os.fdopen(fd, 'w', encoding='utf-8') as destination:
+            return copyTransformed(source, destination, lambda chunk: translateMessage(chunk, table), chunkSize)
+
+class KeywordCipher:
+    def __init__(self, keyword:str):
+        if not validateKeyword(keyword):
+            raise InvalidKeyError("Keyword must contain only alphabetic characters")
+        self.keyword = keyword
+        self.compiledKey = compileKeyword(keyword)
+
+    def encrypt(self, message):
+        # str keeps case of every letter; bytes are mapped on ASCII letters only
+        table = self.compiledKey.encryptBytes if isinstance(message, (bytes, bytearray)) else self.compiledKey.encryptTable
+        return translateMessage(message, table)
+
+    def decrypt(self, cipherText):
+        table = self.compiledKey.decryptBytes if isinstance(cipherText, (bytes, bytearray)) else self.compiledKey.decryptTable
+        return translateMessage(cipherText, table)
+
+    def encryptFile(self, inputFile:str, outputFile:str, chunkSize:int = DEFAULT_CHUNK_SIZE) -> int:
+        return translateFile(self.compiledKey.encryptTable, inputFile, outputFile, chunkSize)
+
+    def decryptFile(self, inputFile:str, outputFile:str, chunkSize:int = DEFAULT_CHUNK_SIZE) -> int:
+        return translateFile(self.compiledKey.decryptTable, inputFile, outputFile, chunkSize)
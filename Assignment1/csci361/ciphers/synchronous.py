@@ -0,0 +1,131 @@
+import os
+from array import array
+from itertools import chain, cycle, islice
+
+from csci361 import fileio, stats
+
+# Synchronous stream cipher from Task 7: k_i = k_{i-1} * k_{i-2} mod 26 added to A-Z letters
+
+# Bytes per step of the file API
+FILE_CHUNK_SIZE = 4 * 1024 * 1024
+
+class PeriodicKeystream:
+    # Read-only view of the first length values of a pre-period + cycle keystream
+    def __init__(self, prePeriod, period, length):
+        self.prePeriod = prePeriod
+        self.period = period
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        # Slices give a list, as generateKeystream used to return
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("keystream index out of range")
+        if index < len(self.prePeriod):
+            return self.prePeriod[index]
+        return self.period[(index - len(self.prePeriod)) % len(self.period)]
+
+    def __iter__(self):
+        return islice(chain(self.prePeriod, cycle(self.period)), self.length)
+
+    def __eq__(self, other):
+        if isinstance(other, (PeriodicKeystream, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+class SynchronousCipher:
+    def __init__(self, k0, k1):
+        self.k0 = k0
+        self.k1 = k1
+        self.prePeriod, self.period = self.findPeriod(k0 % 26, k1 % 26)
+
+    @staticmethod
+    def findPeriod(k0, k1):
+        # k_i = k_{i-1} * k_{i-2} mod 26 has at most 26 * 26 states (k_i, k_{i+1}),
+        # so it is eventually periodic: store the pre-period and one cycle
+        keys = [k0, k1]
+        seen = {}
+        while (keys[-2], keys[-1]) not in seen:
+            seen[(keys[-2], keys[-1])] = len(keys) - 2
+            keys.append((keys[-1] * keys[-2]) % 26)
+        start = seen[(keys[-2], keys[-1])]
+        end = len(keys) - 2
+        return array('B', keys[:start]), array('B', keys[start:end])
+
+    def keystreamAt(self, index):
+        if index < len(self.prePeriod):
+            return self.prePeriod[index]
+        return self.period[(index - len(self.prePeriod)) % len(self.period)]
+
+    def iterKeystream(self, offset=0):
+        return islice(chain(self.prePeriod, cycle(self.period)), offset, None)
+
+    def generateKeystream(self, length):
+        return PeriodicKeystream(self.prePeriod, self.period, length)
+
+    def encrypt_char(self, char, key):
+        if 'A' <= char <= 'Z':
+            return chr(((ord(char) - ord('A') + key) % 26) + ord('A'))
+        return char
+
+    def decrypt_char(self, char, key):
+        if 'A' <= char <= 'Z':
+            return chr(((ord(char) - ord('A') - key) % 26) + ord('A'))
+        return char
+
+    def keystreamArray(self, length, offset=0):
+        # Keystream values offset .. offset + length - 1, so a long text can be taken in chunks
+        import numpy as np
+        from csci361 import textcodes
+
+        with stats.phase('keystream'):
+            head = np.frombuffer(self.prePeriod, dtype=np.uint8)[offset:offset + length]
+            tail = textcodes.tileKeystream(np.frombuffer(self.period, dtype=np.uint8),
+                                           max(0, offset - len(self.prePeriod)), length - len(head))
+            return np.concatenate((head, tail))
+
+    def cryptFile(self, inputFile, outputFile, decrypt=False, chunkSize=FILE_CHUNK_SIZE) -> int:
+        # ASCII text file to file through read-only mmap windows, one chunk at a time, so
+        # memory stays flat whatever the size. The keystream index is the byte offset, which
+        # is the character index the in-memory methods use as long as the text is ASCII.
+        import numpy as np
+        from csci361 import textcodes
+
+        with open(inputFile, 'rb') as source, fileio.atomicOutput(outputFile) as (fd, tempPath):
+            with os.fdopen(fd, 'wb') as destination:
+                size = os.fstat(source.fileno()).st_size
+                chunks = fileio.mappedChunks(source, chunkSize)
+                while True:
+                    with stats.phase('read'):
+                        offset, chunk = next(chunks, (None, None))
+                    if chunk is None:
+                        break
+                    codes = np.frombuffer(chunk, dtype=np.uint8)
+                    with stats.phase('transform'):
+                        codes = textcodes.shiftLetters(codes, self.keystreamArray(len(codes), offset), decrypt)
+                    with stats.phase('write'):
+                        destination.write(codes.tobytes())
+        stats.count('bytes', size)
+        return size
+
+    def encryptFile(self, inputFile, outputFile, chunkSize=FILE_CHUNK_SIZE) -> int:
+        return self.cryptFile(inputFile, outputFile, False, chunkSize)
+
+    def decryptFile(self, inputFile, outputFile, chunkSize=FILE_CHUNK_SIZE) -> int:
+        return self.cryptFile(inputFile, outputFile, True, chunkSize)
+
+    def encryption(self, plaintext):
+        from csci361 import textcodes
+        codes = textcodes.encodeText(plaintext)
+        return textcodes.decodeText(textcodes.shiftLetters(codes, self.keystreamArray(len(codes))))
+
+    def decryption(self, ciphertext):
+        from csci361 import textcodes
+        codes = textcodes.encodeText(ciphertext)
+        return textcodes.decodeText(textcodes.shiftLetters(codes, self.keystreamArray(len(codes)), decrypt=True))
@@ -0,0 +1,203 @@
+from csci361 import keycache
+from csci361.ciphers.errors import CipherError, InvalidKeyError, InvalidInputError
+
+# Tiny Encryption Algorithm: 64-bit blocks, 128-bit key, 32 rounds, and its XTEA and
+# XXTEA successors. All of them keep the key as the same four cached 32-bit words, and
+# each class names its batched NumPy engine in csci361.teabatch (imported on first use)
+# with `algorithm`, which is how the CFB and CTR modes pick the right one.
+
+DELTA = 0x9e3779b9
+
+def unpackKey(key):
+    return tuple(int.from_bytes(key[i:i+4], 'big') for i in range(0, 16, 4))
+
+def keyWords(key):
+    # The unpacked words are shared by every cipher built from the same key bytes
+    if len(key) != 16:
+        raise InvalidKeyError("Key must be 16 bytes (128 bits)")
+    return keycache.cached(('tea', bytes(key)), lambda: unpackKey(key))
+
+class TEA:
+    algorithm = 'tea'
+    roundSums = [(DELTA * (i + 1)) & 0xFFFFFFFF for i in range(32)]
+
+    def __init__(self, key):
+        self.key = list(keyWords(key))
+        self.delta = DELTA
+
+    def encryptWords(self, v0, v1):
+        k0, k1, k2, k3 = self.key
+
+        for sumValue in self.roundSums:
+            v0 = (v0 + (((v1 << 4) + k0) ^ (v1 + sumValue) ^ ((v1 >> 5) + k1))) & 0xFFFFFFFF
+            v1 = (v1 + (((v0 << 4) + k2) ^ (v0 + sumValue) ^ ((v0 >> 5) + k3))) & 0xFFFFFFFF
+
+        return v0, v1
+
+    def decryptWords(self, v0, v1):
+        k0, k1, k2, k3 = self.key
+
+        for sumValue in reversed(self.roundSums):
+            v1 = (v1 - (((v0 << 4) + k2) ^ (v0 + sumValue) ^ ((v0 >> 5) + k3))) & 0xFFFFFFFF
+            v0 = (v0 - (((v1 << 4) + k0) ^ (v1 + sumValue) ^ ((v1 >> 5) + k1))) & 0xFFFFFFFF
+
+        return v0, v1
+
+    def encryptRegister(self, register):
+        # One 64-bit block held as an int, so modes can keep their register as an int
+        v0, v1 = self.encryptWords(register >> 32, register & 0xFFFFFFFF)
+        return (v0 << 32) | v1
+
+    def encryptRegisters(self, hi, lo):
+        # Batched encryptRegister on arrays of high and low 32-bit words
+        from csci361 import teabatch
+        return teabatch.ALGORITHMS[self.algorithm][0](hi, lo, self.key)
+
+    def encryption(self, plainText):
+        if len(plainText) != 8:
+            raise InvalidInputError("Block must be 8 bytes")
+        return self.encryptRegister(int.from_bytes(plainText, 'big')).to_bytes(8, 'big')
+
+    def decryption(self, cipherText):
+        if len(cipherText) != 8:
+            raise InvalidInputError("Block must be 8 bytes")
+        v0, v1 = self.decryptWords(int.from_bytes(cipherText[:4], 'big'), int.from_bytes(cipherText[4:], 'big'))
+        return v0.to_bytes(4, 'big') + v1.to_bytes(4, 'big')
+
+    def encryptBlocks(self, data):
+        # Encrypts many 8-byte blocks in one call, same output as encryption() per block
+        from csci361 import teabatch
+        hi, lo = checkedBlocks(data)
+        return teabatch.blocksToBytes(*self.encryptRegisters(hi, lo))
+
+    def decryptBlocks(self, data):
+        from csci361 import teabatch
+        v0, v1 = checkedBlocks(data)
+        return teabatch.blocksToBytes(*teabatch.ALGORITHMS[self.algorithm][1](v0, v1, self.key))
+
+class XTEA(TEA):
+    # XTEA: the same 64-bit block and key words; each half-round mixes the shifted words
+    # before adding the key, and picks its key word from the running sum
+    algorithm = 'xtea'
+
+    def encryptWords(self, v0, v1):
+        key = self.key
+        sumValue = 0
+
+        for _ in range(32):
+            v0 = (v0 + ((((v1 << 4) ^ (v1 >> 5)) + v1) ^ (sumValue + key[sumValue & 3]))) & 0xFFFFFFFF
+            sumValue = (sumValue + DELTA) & 0xFFFFFFFF
+            v1 = (v1 + ((((v0 << 4) ^ (v0 >> 5)) + v0) ^ (sumValue + key[(sumValue >> 11) & 3]))) & 0xFFFFFFFF
+
+        return v0, v1
+
+    def decryptWords(self, v0, v1):
+        key = self.key
+        sumValue = (DELTA * 32) & 0xFFFFFFFF
+
+        for _ in range(32):
+            v1 = (v1 - ((((v0 << 4) ^ (v0 >> 5)) + v0) ^ (sumValue + key[(sumValue >> 11) & 3]))) & 0xFFFFFFFF
+            sumValue = (sumValue - DELTA) & 0xFFFFFFFF
+            v0 = (v0 - ((((v1 << 4) ^ (v1 >> 5)) + v1) ^ (sumValue + key[sumValue & 3]))) & 0xFFFFFFFF
+
+        return v0, v1
+
+class XXTEA(TEA):
+    # XXTEA (Corrected Block TEA) encrypts a block of any n >= 2 words in 6 + 52 // n
+    # cycles, so wide blocks need far fewer rounds per byte than TEA's 32 per 8 bytes.
+    # encryption() takes a whole message as one block; encryptBlocks() splits data into
+    # blocks of blockWords words and runs them side by side. In the 64-bit CFB and CTR
+    # modes the block is two words.
+    algorithm = 'xxtea'
+
+    def __init__(self, key, blockWords=2):
+        super().__init__(key)
+        if blockWords < 2:
+            raise InvalidInputError("XXTEA blocks must be at least 2 words")
+        self.blockWords = blockWords
+        self.blockSize = 4 * blockWords
+
+    def mix(self, y, z, sumValue, p, e):
+        return ((((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sumValue ^ y) + (self.key[(p & 3) ^ e] ^ z))) & 0xFFFFFFFF
+
+    def encryptBlock(self, words):
+        v = list(words)
+        n = len(v)
+        sumValue = 0
+        z = v[n - 1]
+        for _ in range(6 + 52 // n):
+            sumValue = (sumValue + DELTA) & 0xFFFFFFFF
+            e = (sumValue >> 2) & 3
+            for p in range(n):
+                z = v[p] = (v[p] + self.mix(v[(p + 1) % n], z, sumValue, p, e)) & 0xFFFFFFFF
+        return v
+
+    def decryptBlock(self, words):
+        v = list(words)
+        n = len(v)
+        rounds = 6 + 52 // n
+        sumValue = (rounds * DELTA) & 0xFFFFFFFF
+        y = v[0]
+        for _ in range(rounds):
+            e = (sumValue >> 2) & 3
+            for p in range(n - 1, -1, -1):
+                y = v[p] = (v[p] - self.mix(y, v[p - 1], sumValue, p, e)) & 0xFFFFFFFF
+            sumValue = (sumValue - DELTA) & 0xFFFFFFFF
+        return v
+
+    def encryptWords(self, v0, v1):
+        return tuple(self.encryptBlock((v0, v1)))
+
+    def decryptWords(self, v0, v1):
+        return tuple(self.decryptBlock((v0, v1)))
+
+    def encryption(self, plainText):
+        # The whole message is one block, so it must be a multiple of 4 bytes and at least 8
+        words = checkedWords(plainText)
+        return b''.join(word.to_bytes(4, 'big') for word in self.encryptBlock(words))
+
+    def decryption(self, cipherText):
+        words = checkedWords(cipherText)
+        return b''.join(word.to_bytes(4, 'big') for word in self.decryptBlock(words))
+
+    def encryptBlocks(self, data):
+        from csci361 import teabatch
+        if len(data) % self.blockSize != 0:
+            raise InvalidInputError(f"Data must be a multiple of {self.blockSize} bytes")
+        return teabatch.wordsToBytes(teabatch.xxteaEncryptWords(teabatch.bytesToWords(data, self.blockWords), self.key))
+
+    def decryptBlocks(self, data):
+        from csci361 import teabatch
+        if len(data) % self.blockSize != 0:
+            raise InvalidInputError(f"Data must be a multiple of {self.blockSize} bytes")
+        return teabatch.wordsToBytes(teabatch.xxteaDecryptWords(teabatch.bytesToWords(data, self.blockWords), self.key))
+
+class FirstWordTEA(TEA):
+    # The Task 7 variant: both halves of the block are read from its first word.
+    # Kept so CFB and CombinationCipher output stays identical to the original script.
+    # It is not a permutation, so it cannot decrypt; the CFB modes only ever encrypt.
+
+    def encryptRegister(self, register):
+        v0, v1 = self.encryptWords(register >> 32, register >> 32)
+        return (v0 << 32) | v1
+
+    def encryptRegisters(self, hi, lo):
+        from csci361 import teabatch
+        return teabatch.encryptBlocks(hi, hi, self.key)
+
+    def decryption(self, cipherText):
+        raise CipherError("FirstWordTEA has no decryption; use it through a CFB or CTR mode")
+
+    def decryptBlocks(self, data):
+        raise CipherError("FirstWordTEA has no decryption; use it through a CFB or CTR mode")
+
+def checkedWords(data):
+    if len(data) % 4 != 0 or len(data) < 8:
+        raise InvalidInputError("Block must be a multiple of 4 bytes and at least 8 bytes")
+    return [int.from_bytes(data[i:i + 4], 'big') for i in range(0, len(data), 4)]
+
+def checkedBlocks(data):
+    from csci361 import teabatch
+    if len(data) % 8 != 0:
+        raise InvalidInputError("Data must be a multiple of 8 bytes")
+    return teabatch.bytesToBlocks(data)
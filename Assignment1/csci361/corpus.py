@@ -0,0 +1,80 @@
+import os
+from functools import lru_cache
+
+from csci361 import fileio
+
+# Seeded synthetic A-Z text for the Task 7 benchmarks. The corpus is produced one block
+# at a time, so any size costs one block of memory, and block i has its own generator
+# seeded with (seed, i), so the text is the same however it is read or written.
+#   english: letters drawn independently with English letter frequencies
+#   random:  uniformly distributed letters
+#   pangram: the sentence createTestDocument repeats, as letters only
+
+BLOCK_SIZE = 1024 * 1024
+MODES = ('english', 'random', 'pangram')
+DEFAULT_SEED = 361
+PANGRAM = b"THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG"
+
+def checkMode(mode):
+    if mode not in MODES:
+        raise ValueError(f"Unknown corpus mode '{mode}' (expected one of {', '.join(MODES)})")
+
+@lru_cache(maxsize=None)
+def englishTable():
+    # Maps a uniform 16-bit value to a letter code with English letter frequency
+    import numpy as np
+    from csci361.analysis.ngrams import ENGLISH_FREQUENCIES
+
+    edges = np.round(np.cumsum(ENGLISH_FREQUENCIES / ENGLISH_FREQUENCIES.sum()) * 65536)
+    return (np.searchsorted(edges, np.arange(65536), side='right') + 65).astype(np.uint8)
+
+def generateBlock(index, length, mode=MODES[0], seed=DEFAULT_SEED):
+    # Block index of the corpus as a uint8 array of A-Z codes
+    import numpy as np
+
+    if mode == 'pangram':
+        start = index * BLOCK_SIZE % len(PANGRAM)
+        return np.resize(np.frombuffer(PANGRAM[start:] + PANGRAM[:start], dtype=np.uint8), length)
+    rng = np.random.default_rng([seed, index])
+    if mode == 'random':
+        return rng.integers(65, 91, length, dtype=np.uint8)
+    return englishTable()[rng.integers(0, 65536, length, dtype=np.uint16)]
+
+def iterChunks(size, mode=MODES[0], seed=DEFAULT_SEED):
+    # Yields the first size letters as bytes chunks of at most BLOCK_SIZE
+    checkMode(mode)
+    for index, offset in enumerate(range(0, size, BLOCK_SIZE)):
+        yield generateBlock(index, min(BLOCK_SIZE, size - offset), mode, seed).tobytes()
+
+def corpusText(size, mode=MODES[0], seed=DEFAULT_SEED) -> str:
+    # The corpus as one string, for ciphers that take str; filled in place block by block
+    buffer = bytearray(size)
+    offset = 0
+    for chunk in iterChunks(size, mode, seed):
+        buffer[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return buffer.decode('ascii')
+
+def writeCorpus(path, size, mode=MODES[0], seed=DEFAULT_SEED) -> str:
+    with fileio.atomicOutput(path) as (fd, tempPath):
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iterChunks(size, mode, seed):
+                f.write(chunk)
+    return path
+
+def corpusPath(directory, size, mode=MODES[0], seed=DEFAULT_SEED) -> str:
+    return os.path.join(directory, f"corpus-{mode}-{seed}-{size}.txt")
+
+def ensureCorpus(directory, size, mode=MODES[0], seed=DEFAULT_SEED) -> str:
+    # Writes the corpus file once; later runs reuse it while its size still matches
+    checkMode(mode)
+    path = corpusPath(directory, size, mode, seed)
+    if not (os.path.isfile(path) and os.path.getsize(path) == size):
+        writeCorpus(path, size, mode, seed)
+    return path
+
+def readCorpus(path, chunkSize=BLOCK_SIZE):
+    # Yields a corpus file back as bytes chunks through mmap windows, one window mapped at a time
+    with open(path, 'rb') as f:
+        for _, chunk in fileio.mappedChunks(f, chunkSize):
+            yield chunk
@@ -0,0 +1,58 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+# Output files are written to a temp file next to the target and renamed into place,
+# so a failure halfway never leaves a partial output file behind
+
+# Read once at import: setting the umask to look at it would race with other threads
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+@contextmanager
+def atomicOutput(outputFile):
+    # Yields (fd, path); the caller owns fd and must close it, normally via os.fdopen.
+    # For a new or regular output, path is a temp file that replaces outputFile on success
+    # and is removed on any error; it keeps an existing file's permission bits.
+    # Devices, FIFOs and symlinks are opened and written in place, and path is outputFile,
+    # since replacing them would swap the device or the link itself for a regular file.
+    try:
+        existing = os.lstat(outputFile)
+    except FileNotFoundError:
+        existing = None
+
+    if existing is not None and not stat.S_ISREG(existing.st_mode):
+        try:
+            regular = stat.S_ISREG(os.stat(outputFile).st_mode)
+        except FileNotFoundError:
+            # A dangling symlink: the file it names is created
+            regular = True
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC if regular else os.O_WRONLY
+        yield os.open(outputFile, flags, 0o666), outputFile
+        return
+
+    outputDir = os.path.dirname(os.path.abspath(outputFile))
+    fd, tempPath = tempfile.mkstemp(dir=outputDir, prefix=f".{os.path.basename(outputFile)}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, stat.S_IMODE(existing.st_mode) if existing is not None else 0o666 & ~UMASK)
+        yield fd, tempPath
+        os.replace(tempPath, outputFile)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+
+def mappedChunks(source, chunkSize):
+    # Yields (offset, bytes) over an open binary file, mapping one window at a time so the
+    # resident set stays at about one chunk whatever the file size. chunkSize is rounded
+    # down to the mmap granularity (and to at least one granule).
+    import mmap
+
+    step = max(mmap.ALLOCATIONGRANULARITY, chunkSize // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY)
+    size = os.fstat(source.fileno()).st_size
+    for offset in range(0, size, step):
+        with mmap.mmap(source.fileno(), min(step, size - offset), offset=offset, access=mmap.ACCESS_READ) as window:
+            yield offset, window[:]
@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Process-wide LRU cache for compiled key material (translation tables, unpacked TEA words),
+# so repeated messages under the same key skip the key schedule and keyfile reads
+
+DEFAULT_MAX_SIZE = int(os.environ.get('CSCI361_KEY_CACHE_SIZE', '128'))
+
+class KeyCache:
+    def __init__(self, maxSize=DEFAULT_MAX_SIZE):
+        if maxSize < 0:
+            raise ValueError("Cache size must not be negative")
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, cacheKey, factory):
+        # Returns the cached value for cacheKey, calling factory() to build it on a miss
+        with self.lock:
+            if cacheKey in self.entries:
+                self.entries.move_to_end(cacheKey)
+                self.hits += 1
+                return self.entries[cacheKey]
+            self.misses += 1
+
+        # Build outside the lock; two threads may build the same entry, which is harmless
+        value = factory()
+
+        with self.lock:
+            if self.maxSize > 0:
+                self.entries[cacheKey] = value
+                self.entries.move_to_end(cacheKey)
+                while len(self.entries) > self.maxSize:
+                    self.entries.popitem(last=False)
+        return value
+
+    def resize(self, maxSize):
+        if maxSize < 0:
+            raise ValueError("Cache size must not be negative")
+        with self.lock:
+            self.maxSize = maxSize
+            while len(self.entries) > maxSize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self.entries), 'maxSize': self.maxSize}
+
+defaultCache = KeyCache()
+
+def cached(cacheKey, factory):
+    return defaultCache.get(cacheKey, factory)
+
+def fileCacheKey(kind, filename):
+    # Keyfiles are keyed by path plus mtime and size, so an edited file is re-read
+    path = os.path.abspath(filename)
+    info = os.stat(path)
+    return (kind, path, info.st_mtime_ns, info.st_size)
+
+def setMaxSize(maxSize):
+    defaultCache.resize(maxSize)
+
+def stats() -> dict:
+    return defaultCache.stats()
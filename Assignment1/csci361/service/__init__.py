@@ -0,0 +1 @@
+# Local socket service that keeps the Assignment 1 ciphers warm between requests
@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+
+from csci361.service import protocol
+
+# asyncio client for the cipher server. Requests may be issued concurrently on one
+# connection; they are pipelined and each caller gets its own response back.
+
+class ServiceError(Exception):
+    pass
+
+class CipherClient:
+    def __init__(self, reader, writer, maxFrame=protocol.DEFAULT_MAX_FRAME):
+        self.reader = reader
+        self.writer = writer
+        self.maxFrame = maxFrame
+        self.requestIds = itertools.count(1)
+        self.waiting = {}
+        self.readerTask = asyncio.create_task(self.readResponses())
+
+    @classmethod
+    async def connect(cls, address, maxFrame=protocol.DEFAULT_MAX_FRAME):
+        kind, target = protocol.parseAddress(address)
+        if kind == 'unix':
+            reader, writer = await asyncio.open_unix_connection(target)
+        else:
+            reader, writer = await asyncio.open_connection(*target)
+        return cls(reader, writer, maxFrame)
+
+    async def readResponses(self):
+        try:
+            while True:
+                body = await protocol.readFrame(self.reader, self.maxFrame)
+                if body is None:
+                    break
+                response = protocol.decodeResponse(body)
+                future = self.waiting.pop(response.requestId, None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+            error = ConnectionError("Server closed the connection")
+        except Exception as e:
+            error = e
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(error)
+        self.waiting.clear()
+
+    async def request(self, op, cipher, keyId, payload=b'') -> bytes:
+        # cipher is a protocol cipher id or name; raises ServiceError when the server reports one
+        cipherId = protocol.CIPHER_IDS[cipher] if isinstance(cipher, str) else cipher
+        if self.readerTask.done():
+            raise ConnectionError("Connection is closed")
+        requestId = next(self.requestIds) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[requestId] = future
+        self.writer.write(protocol.encodeRequest(requestId, op, cipherId, keyId, payload))
+        await self.writer.drain()
+        response = await future
+        if response.status != protocol.STATUS_OK:
+            raise ServiceError(bytes(response.payload).decode('utf-8', 'replace'))
+        return bytes(response.payload)
+
+    async def encrypt(self, cipher, keyId, payload) -> bytes:
+        return await self.request(protocol.OP_ENCRYPT, cipher, keyId, payload)
+
+    async def decrypt(self, cipher, keyId, payload) -> bytes:
+        return await self.request(protocol.OP_DECRYPT, cipher, keyId, payload)
+
+    async def ping(self):
+        await self.request(protocol.OP_PING, 0, '')
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self.readerTask
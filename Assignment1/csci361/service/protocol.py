@@ -0,0 +1,89 @@
+import asyncio
+import struct
+from collections import namedtuple
+
+# Length-prefixed framing shared by the server and the client. Every frame is a 4-byte
+# big-endian body length followed by the body:
+#   request:  requestId u32 | op u8 | cipher u8 | keyIdLength u8 | keyId | payload
+#   response: requestId u32 | status u8 | payload (the result, or a UTF-8 error message)
+# Responses come back on the same connection in request order.
+
+LENGTH = struct.Struct('!I')
+REQUEST = struct.Struct('!IBBB')
+RESPONSE = struct.Struct('!IB')
+
+DEFAULT_MAX_FRAME = 64 * 1024 * 1024
+
+OP_ENCRYPT = 1
+OP_DECRYPT = 2
+OP_PING = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+CIPHERS = {
+    1: 'keyword',
+    2: 'kamasutra',
+    3: 'fibonacci',
+    4: 'synchronous',
+    5: 'tea-cfb',
+    6: 'tea-ctr',
+    7: 'combination',
+}
+CIPHER_IDS = {name: cipherId for cipherId, name in CIPHERS.items()}
+
+Request = namedtuple('Request', ['requestId', 'op', 'cipherId', 'keyId', 'payload'])
+Response = namedtuple('Response', ['requestId', 'status', 'payload'])
+
+class ProtocolError(Exception):
+    pass
+
+def encodeRequest(requestId, op, cipherId, keyId, payload) -> bytes:
+    keyBytes = keyId.encode('utf-8')
+    if len(keyBytes) > 255:
+        raise ProtocolError("Key id must be at most 255 bytes")
+    bodyLength = REQUEST.size + len(keyBytes) + len(payload)
+    return LENGTH.pack(bodyLength) + REQUEST.pack(requestId, op, cipherId, len(keyBytes)) + keyBytes + bytes(payload)
+
+def decodeRequest(body) -> Request:
+    if len(body) < REQUEST.size:
+        raise ProtocolError("Request frame too short")
+    requestId, op, cipherId, keyLength = REQUEST.unpack_from(body)
+    keyEnd = REQUEST.size + keyLength
+    if len(body) < keyEnd:
+        raise ProtocolError("Request frame too short for its key id")
+    keyId = bytes(body[REQUEST.size:keyEnd]).decode('utf-8', 'replace')
+    return Request(requestId, op, cipherId, keyId, body[keyEnd:])
+
+def encodeResponse(requestId, status, payload) -> bytes:
+    return LENGTH.pack(RESPONSE.size + len(payload)) + RESPONSE.pack(requestId, status) + bytes(payload)
+
+def decodeResponse(body) -> Response:
+    if len(body) < RESPONSE.size:
+        raise ProtocolError("Response frame too short")
+    requestId, status = RESPONSE.unpack_from(body)
+    return Response(requestId, status, body[RESPONSE.size:])
+
+async def readFrame(reader, maxFrame=DEFAULT_MAX_FRAME):
+    # Body of the next frame, or None when the peer closed the connection between frames
+    try:
+        header = await reader.readexactly(LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ProtocolError("Connection closed inside a frame header")
+    (length,) = LENGTH.unpack(header)
+    if length > maxFrame:
+        raise ProtocolError(f"Frame of {length} bytes is over the {maxFrame} byte limit")
+    return await reader.readexactly(length)
+
+def parseAddress(address):
+    # 'unix:/path/to/socket' or 'tcp://host:port' (also plain 'host:port')
+    if address.startswith('unix:'):
+        return ('unix', address[len('unix:'):])
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    host, separator, port = address.rpartition(':')
+    if not separator or not port.isdigit():
+        raise ValueError(f"Invalid address '{address}', expected tcp://host:port or unix:/path")
+    return ('tcp', (host or '127.0.0.1', int(port)))
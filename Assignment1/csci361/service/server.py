@@ -0,0 +1,214 @@
+import asyncio
+import os
+import stat
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from csci361.ciphers.errors import CipherError
+from csci361.service import protocol
+
+# asyncio cipher server. Cipher objects are built once per (cipher, key id) from a key
+# store and reused for every request. The substitution ciphers run inline on the event
+# loop; TEA-based ciphers run in an executor whose workers build the same registry once.
+# Each connection reads ahead up to pipelineDepth requests; when that many are in flight
+# the reader stops and the socket buffers fill, which pushes back on the client.
+
+DEFAULT_PIPELINE_DEPTH = 32
+
+# Key ids available when no key store is given; the keys are the ones the Task scripts use
+DEFAULT_KEYS = {
+    'keyword': {'default': {'keyword': 'STRAWBERRY'}},
+    'kamasutra': {'default': {'key': 'abcdefghijklmnopqrstuvwxyz'}},
+    'fibonacci': {'default': {'k0': 7, 'k1': 11}},
+    'synchronous': {'default': {'k0': 7, 'k1': 11}},
+    'tea-cfb': {'default': {'key': 'CRYPTOGRAPHY_KEY', 'iv': 'INITIAL_', 'feedbackBits': 64}},
+    'tea-ctr': {'default': {'key': 'YELLOW SUBMARINE', 'nonce': 'INITVECT'}},
+    'combination': {'default': {'key': 'YELLOW SUBMARINE', 'iv': 'INITVECT', 'k0': 7, 'k1': 11}},
+}
+
+# Ciphers that hold the GIL for long stretches and go to the executor
+HEAVY_CIPHERS = {'tea-cfb', 'tea-ctr', 'combination'}
+
+Handler = namedtuple('Handler', ['encrypt', 'decrypt'])
+
+def textHandler(encrypt, decrypt):
+    # Wraps str -> str ciphers for UTF-8 payloads
+    return Handler(lambda data: encrypt(bytes(data).decode('utf-8')).encode('utf-8'),
+                   lambda data: decrypt(bytes(data).decode('utf-8')).encode('utf-8'))
+
+def buildHandler(cipherName, params) -> Handler:
+    from csci361 import ciphers
+
+    if cipherName == 'keyword':
+        cipher = ciphers.KeywordCipher(params['keyword'])
+        return Handler(lambda data: cipher.encrypt(bytes(data)), lambda data: cipher.decrypt(bytes(data)))
+    if cipherName == 'kamasutra':
+        cipher = ciphers.KamaSutraCipher(params['key'])
+        return Handler(lambda data: cipher.encrypt(bytes(data)), lambda data: cipher.decrypt(bytes(data)))
+    if cipherName == 'fibonacci':
+        cipher = ciphers.FibonacciStreamCipher(int(params['k0']), int(params['k1']))
+        return textHandler(cipher.encrypt, cipher.decrypt)
+    if cipherName == 'synchronous':
+        cipher = ciphers.SynchronousCipher(int(params['k0']), int(params['k1']))
+        return textHandler(cipher.encryption, cipher.decryption)
+    if cipherName == 'tea-cfb':
+        cipher = ciphers.TEA_CFB(params['key'].encode('latin-1'))
+        iv = params['iv'].encode('latin-1')
+        feedbackBits = int(params.get('feedbackBits', 64))
+        cipher.checkParameters(iv, feedbackBits)
+        return Handler(lambda data: cipher.encryption(bytes(data), iv, feedbackBits),
+                       lambda data: cipher.decryption(bytes(data), iv, feedbackBits))
+    if cipherName == 'tea-ctr':
+        # One CTR worker per request; the executor already spreads requests over cores
+        cipher = ciphers.CTR(ciphers.TEA(params['key'].encode('latin-1')), params['nonce'].encode('latin-1'), workers=1)
+        return Handler(lambda data: cipher.encrypt(bytes(data)), lambda data: cipher.decrypt(bytes(data)))
+    if cipherName == 'combination':
+        cipher = ciphers.CombinationCipher(params['key'].encode('latin-1'), params['iv'].encode('latin-1'),
+                                           int(params['k0']), int(params['k1']))
+        return textHandler(cipher.encryption, cipher.decryption)
+    raise ValueError(f"Unknown cipher '{cipherName}'")
+
+def buildRegistry(keyStore) -> dict:
+    # {(cipher name, key id): Handler} for every entry of the key store
+    registry = {}
+    for cipherName, keys in keyStore.items():
+        if cipherName not in protocol.CIPHER_IDS:
+            raise ValueError(f"Unknown cipher '{cipherName}' in key store")
+        for keyId, params in keys.items():
+            try:
+                registry[(cipherName, keyId)] = buildHandler(cipherName, params)
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"Key '{keyId}' for {cipherName} is missing or has a bad parameter: {e}")
+    return registry
+
+# Registry of an executor worker, built once by initWorker
+workerRegistry = None
+
+def initWorker(keyStore):
+    global workerRegistry
+    workerRegistry = buildRegistry({name: keys for name, keys in keyStore.items() if name in HEAVY_CIPHERS})
+
+def runHeavy(cipherName, keyId, op, payload):
+    handler = workerRegistry[(cipherName, keyId)]
+    return handler.encrypt(payload) if op == protocol.OP_ENCRYPT else handler.decrypt(payload)
+
+def createExecutor(keyStore, workers=None, useThreads=False):
+    workers = workers or os.cpu_count() or 1
+    if useThreads:
+        return ThreadPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(keyStore,))
+    return ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(keyStore,))
+
+class CipherServer:
+    def __init__(self, keyStore=None, executor=None, pipelineDepth=DEFAULT_PIPELINE_DEPTH,
+                 maxFrame=protocol.DEFAULT_MAX_FRAME):
+        if pipelineDepth < 1:
+            raise ValueError("Pipeline depth must be positive")
+        self.keyStore = keyStore if keyStore is not None else DEFAULT_KEYS
+        self.registry = buildRegistry(self.keyStore)
+        self.executor = executor
+        self.pipelineDepth = pipelineDepth
+        self.maxFrame = maxFrame
+        self.requests = 0
+        self.errors = 0
+
+    async def process(self, request):
+        # Result bytes of one request; raises for anything the client should see as an error
+        if request.op == protocol.OP_PING:
+            return b''
+        if request.op not in (protocol.OP_ENCRYPT, protocol.OP_DECRYPT):
+            raise ValueError(f"Unknown operation {request.op}")
+        cipherName = protocol.CIPHERS.get(request.cipherId)
+        if cipherName is None:
+            raise ValueError(f"Unknown cipher id {request.cipherId}")
+        handler = self.registry.get((cipherName, request.keyId))
+        if handler is None:
+            raise ValueError(f"Unknown key id '{request.keyId}' for {cipherName}")
+
+        if cipherName in HEAVY_CIPHERS and self.executor is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, runHeavy, cipherName, request.keyId,
+                                              request.op, bytes(request.payload))
+        return handler.encrypt(request.payload) if request.op == protocol.OP_ENCRYPT else handler.decrypt(request.payload)
+
+    async def respond(self, request):
+        try:
+            result = await self.process(request)
+            return protocol.encodeResponse(request.requestId, protocol.STATUS_OK, result)
+        except (CipherError, ValueError, UnicodeError) as e:
+            self.errors += 1
+            return protocol.encodeResponse(request.requestId, protocol.STATUS_ERROR, str(e).encode('utf-8'))
+        except Exception as e:
+            # Anything else (a broken executor pool, a bug in a cipher) fails this request only
+            self.errors += 1
+            return protocol.encodeResponse(request.requestId, protocol.STATUS_ERROR,
+                                           f"{type(e).__name__}: {e}".encode('utf-8'))
+
+    async def writeResponses(self, pending, writer):
+        # Writes responses in request order and waits for the socket to drain after each.
+        # Once the socket fails it keeps taking requests off the queue and cancels them,
+        # so the reader never blocks on a full queue
+        broken = False
+        while True:
+            task = await pending.get()
+            if task is None:
+                return
+            if broken:
+                task.cancel()
+                continue
+            try:
+                writer.write(await task)
+                await writer.drain()
+            except ConnectionError:
+                broken = True
+
+    async def handleConnection(self, reader, writer):
+        pending = asyncio.Queue(maxsize=self.pipelineDepth)
+        writerTask = asyncio.create_task(self.writeResponses(pending, writer))
+        waiting = None
+        cancelled = False
+        try:
+            while not writerTask.done():
+                body = await protocol.readFrame(reader, self.maxFrame)
+                if body is None:
+                    break
+                self.requests += 1
+                request = protocol.decodeRequest(body)
+                # Blocks once pipelineDepth requests are in flight
+                waiting = asyncio.create_task(self.respond(request))
+                await pending.put(waiting)
+                waiting = None
+        except (protocol.ProtocolError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown. This is the connection's own task and nothing awaits it, so the
+            # cancellation ends here once every request still in flight is cancelled below
+            cancelled = True
+            writerTask.cancel()
+            if waiting is not None:
+                waiting.cancel()
+        finally:
+            if not cancelled and not writerTask.done():
+                await pending.put(None)
+            try:
+                await writerTask
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            while not pending.empty():
+                task = pending.get_nowait()
+                if task is not None:
+                    task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def start(self, address):
+        kind, target = protocol.parseAddress(address)
+        if kind == 'unix':
+            # A socket left behind by a previous run is replaced; any other file is an error
+            if os.path.exists(target) and stat.S_ISSOCK(os.stat(target).st_mode):
+                os.remove(target)
+            return await asyncio.start_unix_server(self.handleConnection, path=target)
+        host, port = target
+        return await asyncio.start_server(self.handleConnection, host, port)
@@ -0,0 +1,111 @@
+import atexit
+import json
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+# Opt-in instrumentation for the cipher CLIs: per-phase timers, counters and an optional
+# tracemalloc peak, dumped as JSON by --stats. Nothing is recorded until enable() is called;
+# until then phase() hands back one shared no-op context manager and count() returns at
+# once, so the library calls cost a global lookup. Calls sit at chunk or batch level, never
+# per block. Work done in worker processes is not seen by the parent's counters.
+
+enabled = False
+tracingMemory = False
+startNs = 0
+timers = {}
+counters = {}
+lock = threading.Lock()
+
+NO_PHASE = nullcontext()
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        with lock:
+            timer = timers.setdefault(self.name, [0, 0])
+            timer[0] += 1
+            timer[1] += elapsed
+        return False
+
+def phase(name):
+    # with stats.phase('transform'): ... adds the block's wall time to that phase
+    if not enabled:
+        return NO_PHASE
+    return Phase(name)
+
+def count(name, amount=1):
+    if not enabled:
+        return
+    with lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def enable(output=None, traceMemory=False):
+    # Starts recording; with an output ('-' for stderr or a file name) the report is
+    # written when the process exits, including exits through sys.exit
+    global enabled, tracingMemory, startNs
+    reset()
+    enabled = True
+    startNs = time.perf_counter_ns()
+    if traceMemory:
+        import tracemalloc
+        tracemalloc.start()
+        tracingMemory = True
+    if output is not None:
+        atexit.register(writeReport, output)
+
+def reset():
+    with lock:
+        timers.clear()
+        counters.clear()
+
+def report() -> dict:
+    from csci361 import bench
+
+    result = {
+        'wallSeconds': (time.perf_counter_ns() - startNs) / 1e9 if enabled else 0.0,
+        'phases': {name: {'calls': calls, 'seconds': ns / 1e9} for name, (calls, ns) in timers.items()},
+        'counters': dict(counters),
+        'peakRssBytes': bench.peakMemory(),
+    }
+    if tracingMemory:
+        import tracemalloc
+        result['tracemallocPeakBytes'] = tracemalloc.get_traced_memory()[1]
+    return result
+
+def writeReport(output):
+    text = json.dumps(report(), indent=2)
+    if output == '-':
+        print(text, file=sys.stderr)
+        return
+    try:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    except OSError as e:
+        print(f"Error: Cannot write stats to {output}. {e}", file=sys.stderr)
+
+def takeFlags(argv):
+    # For the scripts that read sys.argv by hand: removes '--stats', '--stats=FILE' and
+    # '--stats-memory' from argv and returns (output, traceMemory); output is None when off
+    output = None
+    traceMemory = False
+    for arg in list(argv):
+        if arg == '--stats':
+            output = '-'
+        elif arg.startswith('--stats='):
+            output = arg[len('--stats='):] or '-'
+        elif arg == '--stats-memory':
+            traceMemory = True
+            output = output or '-'
+        else:
+            continue
+        argv.remove(arg)
+    return output, traceMemory
@@ -0,0 +1,144 @@
+import numpy as np
+
+# Batched TEA core: runs the 32 rounds on N 64-bit blocks at once.
+# uint32 arrays wrap on overflow, which gives the same result as masking with 0xffffffff.
+
+DELTA = 0x9e3779b9
+ROUNDS = 32
+
+# Round sums are the same for every block, so they are computed once
+roundSums = [np.uint32((DELTA * (i + 1)) & 0xffffffff) for i in range(ROUNDS)]
+
+def unpackKey(key) -> tuple:
+    if len(key) != 16:
+        raise ValueError("Key must be 16 bytes (128 bits)")
+    return tuple(np.uint32(int.from_bytes(key[i:i+4], 'big')) for i in range(0, 16, 4))
+
+def keyWords(key) -> tuple:
+    # Accepts either raw key bytes or the four 32-bit words the classes already store
+    if isinstance(key, (bytes, bytearray)):
+        return unpackKey(key)
+    if len(key) != 4:
+        raise ValueError("Key must be four 32-bit words")
+    return tuple(np.uint32(k) for k in key)
+
+def encryptBlocks(v0, v1, key):
+    k0, k1, k2, k3 = keyWords(key)
+    v0 = np.array(v0, dtype=np.uint32)
+    v1 = np.array(v1, dtype=np.uint32)
+
+    for sumValue in roundSums:
+        v0 += ((v1 << 4) + k0) ^ (v1 + sumValue) ^ ((v1 >> 5) + k1)
+        v1 += ((v0 << 4) + k2) ^ (v0 + sumValue) ^ ((v0 >> 5) + k3)
+
+    return v0, v1
+
+def decryptBlocks(v0, v1, key):
+    k0, k1, k2, k3 = keyWords(key)
+    v0 = np.array(v0, dtype=np.uint32)
+    v1 = np.array(v1, dtype=np.uint32)
+
+    for sumValue in reversed(roundSums):
+        v1 -= ((v0 << 4) + k2) ^ (v0 + sumValue) ^ ((v0 >> 5) + k3)
+        v0 -= ((v1 << 4) + k0) ^ (v1 + sumValue) ^ ((v1 >> 5) + k1)
+
+    return v0, v1
+
+def bytesToBlocks(data):
+    if len(data) % 8 != 0:
+        raise ValueError("Data must be a multiple of 8 bytes")
+    words = np.frombuffer(data, dtype='>u4').astype(np.uint32)
+    return words[0::2], words[1::2]
+
+def blocksToBytes(v0, v1) -> bytes:
+    words = np.empty(len(v0) * 2, dtype='>u4')
+    words[0::2] = v0
+    words[1::2] = v1
+    return words.tobytes()
+
+# XTEA: the key word of each half-round is picked by the running sum
+def xteaEncryptBlocks(v0, v1, key):
+    k = keyWords(key)
+    v0 = np.array(v0, dtype=np.uint32)
+    v1 = np.array(v1, dtype=np.uint32)
+
+    sumValue = 0
+    for _ in range(ROUNDS):
+        v0 += (((v1 << 4) ^ (v1 >> 5)) + v1) ^ np.uint32((sumValue + int(k[sumValue & 3])) & 0xffffffff)
+        sumValue = (sumValue + DELTA) & 0xffffffff
+        v1 += (((v0 << 4) ^ (v0 >> 5)) + v0) ^ np.uint32((sumValue + int(k[(sumValue >> 11) & 3])) & 0xffffffff)
+
+    return v0, v1
+
+def xteaDecryptBlocks(v0, v1, key):
+    k = keyWords(key)
+    v0 = np.array(v0, dtype=np.uint32)
+    v1 = np.array(v1, dtype=np.uint32)
+
+    sumValue = (DELTA * ROUNDS) & 0xffffffff
+    for _ in range(ROUNDS):
+        v1 -= (((v0 << 4) ^ (v0 >> 5)) + v0) ^ np.uint32((sumValue + int(k[(sumValue >> 11) & 3])) & 0xffffffff)
+        sumValue = (sumValue - DELTA) & 0xffffffff
+        v0 -= (((v1 << 4) ^ (v1 >> 5)) + v1) ^ np.uint32((sumValue + int(k[sumValue & 3])) & 0xffffffff)
+
+    return v0, v1
+
+# XXTEA (Corrected Block TEA) on blocks of n >= 2 words, 6 + 52 // n cycles over the block.
+# words is an (n, m) array: row p holds word p of each of the m blocks, so every step of
+# the serial walk along a block runs on all m blocks at once.
+def xxteaMix(y, z, sumValue, keyWord):
+    return (((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sumValue ^ y) + (keyWord ^ z))
+
+def xxteaEncryptWords(words, key):
+    k = keyWords(key)
+    v = np.array(words, dtype=np.uint32, order='C')
+    n = len(v)
+    sumValue = 0
+    z = v[n - 1]
+    for _ in range(6 + 52 // n):
+        sumValue = (sumValue + DELTA) & 0xffffffff
+        e = (sumValue >> 2) & 3
+        for p in range(n):
+            v[p] += xxteaMix(v[(p + 1) % n], z, np.uint32(sumValue), k[(p & 3) ^ e])
+            z = v[p]
+    return v
+
+def xxteaDecryptWords(words, key):
+    k = keyWords(key)
+    v = np.array(words, dtype=np.uint32, order='C')
+    n = len(v)
+    rounds = 6 + 52 // n
+    sumValue = (rounds * DELTA) & 0xffffffff
+    y = v[0]
+    for _ in range(rounds):
+        e = (sumValue >> 2) & 3
+        for p in range(n - 1, -1, -1):
+            v[p] -= xxteaMix(y, v[p - 1], np.uint32(sumValue), k[(p & 3) ^ e])
+            y = v[p]
+        sumValue = (sumValue - DELTA) & 0xffffffff
+    return v
+
+def xxteaEncryptBlocks(v0, v1, key):
+    # Two-word XXTEA blocks, the shape the 64-bit modes use
+    v = xxteaEncryptWords(np.stack([np.asarray(v0, dtype=np.uint32), np.asarray(v1, dtype=np.uint32)]), key)
+    return v[0], v[1]
+
+def xxteaDecryptBlocks(v0, v1, key):
+    v = xxteaDecryptWords(np.stack([np.asarray(v0, dtype=np.uint32), np.asarray(v1, dtype=np.uint32)]), key)
+    return v[0], v[1]
+
+def bytesToWords(data, blockWords):
+    # (blockWords, m) big-endian words of m consecutive blocks
+    if len(data) % (4 * blockWords) != 0:
+        raise ValueError(f"Data must be a multiple of {4 * blockWords} bytes")
+    return np.frombuffer(data, dtype='>u4').astype(np.uint32).reshape(-1, blockWords).T
+
+def wordsToBytes(words) -> bytes:
+    return np.ascontiguousarray(words.T).astype('>u4').tobytes()
+
+# Batched (encrypt, decrypt) over v0/v1 word arrays for each 64-bit member of the family
+ALGORITHMS = {
+    'tea': (encryptBlocks, decryptBlocks),
+    'xtea': (xteaEncryptBlocks, xteaDecryptBlocks),
+    'xxtea': (xxteaEncryptBlocks, xxteaDecryptBlocks),
+}
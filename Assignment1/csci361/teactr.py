@@ -0,0 +1,120 @@
+import os
+
+from csci361 import fileio, stats
+
+# TEA in counter mode. The keystream block for index i is E(nonce + i mod 2^64),
+# so any block range can be produced on its own and large inputs split across processes.
+# NumPy and the process pool are imported where they are used so importing the CTR mode stays cheap.
+# algorithm names the 64-bit TEA-family block function in teabatch.ALGORITHMS.
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+def checkChunkSize(chunkSize):
+    if chunkSize < 8 or chunkSize % 8 != 0:
+        raise ValueError("Chunk size must be a positive multiple of 8 bytes")
+
+def keyTuple(key):
+    # Raw key bytes or the four 32-bit words the TEA classes store
+    if isinstance(key, (bytes, bytearray)):
+        if len(key) != 16:
+            raise ValueError("Key must be 16 bytes (128 bits)")
+        return tuple(int.from_bytes(key[i:i+4], 'big') for i in range(0, 16, 4))
+    if len(key) != 4:
+        raise ValueError("Key must be four 32-bit words")
+    return tuple(int(k) for k in key)
+
+def countWork(length):
+    # Counted in the calling process, so work done by workers shows up in its stats
+    stats.count('teaBlocks', (length + 7) // 8)
+    stats.count('bytes', length)
+
+def keystream(key, nonce, startBlock, count, algorithm='tea'):
+    # Returns count * 8 keystream bytes as a uint8 array, starting at block startBlock
+    import numpy as np
+    from csci361 import teabatch
+
+    with stats.phase('keystream'):
+        nonceValue = int.from_bytes(nonce, 'big')
+        first = (nonceValue + startBlock) & 0xffffffffffffffff
+        counters = np.arange(count, dtype=np.uint64) + np.uint64(first)
+        v0 = (counters >> np.uint64(32)).astype(np.uint32)
+        v1 = (counters & np.uint64(0xffffffff)).astype(np.uint32)
+        v0, v1 = teabatch.ALGORITHMS[algorithm][0](v0, v1, key)
+        return np.frombuffer(teabatch.blocksToBytes(v0, v1), dtype=np.uint8)
+
+def cryptRange(key, nonce, data, startBlock, algorithm='tea') -> bytes:
+    # Encryption and decryption are the same XOR; data must start on a block boundary
+    import numpy as np
+
+    count = (len(data) + 7) // 8
+    stream = keystream(key, nonce, startBlock, count, algorithm)[:len(data)]
+    return (np.frombuffer(data, dtype=np.uint8) ^ stream).tobytes()
+
+def cryptFileRange(key, nonce, inputFile, outputFile, offset, length, algorithm='tea') -> int:
+    # Worker: each process reads and writes its own byte range, so no data is pickled
+    inFd = os.open(inputFile, os.O_RDONLY)
+    try:
+        data = os.pread(inFd, length, offset)
+    finally:
+        os.close(inFd)
+
+    outFd = os.open(outputFile, os.O_WRONLY)
+    try:
+        os.pwrite(outFd, cryptRange(key, nonce, data, offset // 8, algorithm), offset)
+    finally:
+        os.close(outFd)
+    return len(data)
+
+def crypt(key, nonce, data, workers=None, chunkSize=DEFAULT_CHUNK_SIZE, algorithm='tea') -> bytes:
+    checkChunkSize(chunkSize)
+    if len(nonce) != 8:
+        raise ValueError("Nonce must be 8 bytes")
+    key = keyTuple(key)
+    workers = workers or os.cpu_count() or 1
+    countWork(len(data))
+
+    if workers == 1 or len(data) <= chunkSize:
+        return cryptRange(key, nonce, data, 0, algorithm)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    offsets = range(0, len(data), chunkSize)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(cryptRange,
+                         [key] * len(offsets), [nonce] * len(offsets),
+                         [data[offset:offset + chunkSize] for offset in offsets],
+                         [offset // 8 for offset in offsets], [algorithm] * len(offsets))
+        return b''.join(parts)
+
+def cryptFile(key, nonce, inputFile, outputFile, workers=None, chunkSize=DEFAULT_CHUNK_SIZE, algorithm='tea') -> int:
+    checkChunkSize(chunkSize)
+    if len(nonce) != 8:
+        raise ValueError("Nonce must be 8 bytes")
+    key = keyTuple(key)
+    workers = workers or os.cpu_count() or 1
+
+    size = os.path.getsize(inputFile)
+    offsets = range(0, size, chunkSize)
+    countWork(size)
+
+    # Written to a temp file so an output that names the input is not cleared before it is read
+    with fileio.atomicOutput(outputFile) as (fd, tempPath):
+        # Size the output up front so workers can write their ranges in any order
+        try:
+            os.ftruncate(fd, size)
+        finally:
+            os.close(fd)
+
+        if workers == 1 or size <= chunkSize:
+            for offset in offsets:
+                cryptFileRange(key, nonce, inputFile, tempPath, offset, min(chunkSize, size - offset), algorithm)
+            return size
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(cryptFileRange, key, nonce, inputFile, tempPath,
+                                   offset, min(chunkSize, size - offset), algorithm) for offset in offsets]
+            for future in futures:
+                future.result()
+    return size
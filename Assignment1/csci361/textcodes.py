@@ -0,0 +1,69 @@
+import numpy as np
+
+# Helpers for running A-Z shift ciphers over whole strings as NumPy arrays
+
+def encodeText(text):
+    # ASCII text becomes one uint8 per character; anything else falls back to
+    # UTF-32 so there is still exactly one array element per character
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def decodeText(codes) -> str:
+    if codes.dtype == np.uint8:
+        return codes.tobytes().decode('ascii')
+    return codes.astype(np.uint32).tobytes().decode('utf-32-le')
+
+def tileKeystream(period, offset, length):
+    # Repeats one keystream period to length values, starting at position offset. The
+    # rotated period is written once and then copied onto itself in doubling runs.
+    period = np.asarray(period, dtype=np.uint8)
+    start = offset % len(period)
+    stream = np.empty(length, dtype=np.uint8)
+    first = min(length, len(period))
+    stream[:first] = np.concatenate((period[start:], period[:start]))[:first]
+    filled = first
+    while filled < length:
+        step = min(filled, length - filled)
+        stream[filled:filled + step] = stream[:step]
+        filled += step
+    return stream
+
+def shiftLetters(codes, keystream, decrypt=False):
+    # Adds (or subtracts) the keystream mod 26 on A-Z positions, leaving every other character as is.
+    # Arithmetic stays in the array dtype: the wrapped values only land on non-letters, which are discarded.
+    if decrypt:
+        keystream = 26 - keystream
+    shifted = codes - codes.dtype.type(65)
+    shifted += keystream.astype(codes.dtype)
+    shifted %= 26
+    shifted += 65
+    isLetter = (codes >= 65) & (codes <= 90)
+    np.copyto(shifted, codes, where=~isLetter)
+    return shifted
+
+# Task 6 input as values: a-z upper-cased, then (code - 65) mod 26 for every character
+FOLD_TABLE = bytes(((code - 32 if 97 <= code <= 122 else code) - 65) % 26 for code in range(256))
+
+def foldText(text):
+    # text.replace(" ", "").upper() reduced to one 0..25 value per character, as characterToNumber
+    # mod 26 gives. ASCII text is done in a single bytes.translate that also drops the spaces.
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii').translate(FOLD_TABLE, b' '), dtype=np.uint8)
+    codes = encodeText(text.replace(" ", "").upper())
+    # -65 is 13 mod 26, so the sum stays non-negative in the array dtype
+    values = codes + codes.dtype.type(13)
+    np.remainder(values, 26, out=values)
+    return values.astype(np.uint8, copy=False)
+
+def shiftAll(values, keystream, decrypt=False):
+    # A-Z codes of (value +/- k) mod 26, matching numberToCharacter. Everything stays in uint8:
+    # decryption adds (26 - k) % 26, and with both terms below 26 the sum is reduced by one
+    # conditional subtraction, taken as min(x, x - 26) since x - 26 wraps round below 26.
+    if decrypt:
+        keystream = np.subtract(26, keystream, dtype=np.uint8)
+        keystream[keystream == 26] = 0
+    shifted = values + keystream
+    np.minimum(shifted, shifted - np.uint8(26), out=shifted)
+    shifted += np.uint8(65)
+    return shifted
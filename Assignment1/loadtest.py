@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from csci361 import bench
+from csci361.service import protocol
+from csci361.service.client import CipherClient, ServiceError
+
+# Load test for the cipher service: several connections, each keeping up to pipeline
+# requests in flight, until the request budget is used. Reports requests per second
+# and latency percentiles measured from send to response.
+
+DEFAULT_ADDRESS = 'tcp://127.0.0.1:3610'
+TEXT_CIPHERS = {'fibonacci', 'synchronous', 'combination'}
+
+def makePayload(cipher, size, seed):
+    rng = random.Random(seed)
+    if cipher in TEXT_CIPHERS:
+        return bytes(rng.choices(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=size))
+    if cipher in ('keyword', 'kamasutra'):
+        return bytes(rng.choices(b'abcdefghijklmnopqrstuvwxyz ', k=size))
+    return rng.randbytes(size)
+
+async def runConnection(args, op, payload, budget, latencies, failures):
+    client = await CipherClient.connect(args.connect)
+
+    async def worker():
+        while budget[0] > 0:
+            budget[0] -= 1
+            start = time.perf_counter_ns()
+            try:
+                await client.request(op, args.cipher, args.key, payload)
+            except ServiceError as e:
+                failures.append(str(e))
+                continue
+            latencies.append(time.perf_counter_ns() - start)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.pipeline)))
+    finally:
+        await client.close()
+
+async def loadTest(args):
+    op = protocol.OP_ENCRYPT if args.op == 'encrypt' else protocol.OP_DECRYPT
+    payload = makePayload(args.cipher, args.size, args.seed)
+    budget = [args.requests]
+    latencies, failures = [], []
+    start = time.perf_counter_ns()
+    await asyncio.gather(*(runConnection(args, op, payload, budget, latencies, failures)
+                           for _ in range(args.connections)))
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    return elapsed, latencies, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the cipher service")
+    parser.add_argument('-c', '--connect', default=DEFAULT_ADDRESS,
+                        help=f"tcp://host:port or unix:/path (default {DEFAULT_ADDRESS})")
+    parser.add_argument('--cipher', default='keyword', choices=list(protocol.CIPHER_IDS), help='Cipher to call (default keyword)')
+    parser.add_argument('--key', default='default', help='Key id in the server key store (default: default)')
+    parser.add_argument('--op', default='encrypt', choices=('encrypt', 'decrypt'))
+    parser.add_argument('-s', '--size', default='1K', help='Payload size (default 1K)')
+    parser.add_argument('-n', '--requests', type=int, default=10000, help='Total requests (default 10000)')
+    parser.add_argument('--connections', type=int, default=4, help='Concurrent connections (default 4)')
+    parser.add_argument('--pipeline', type=int, default=16, help='Requests in flight per connection (default 16)')
+    parser.add_argument('--seed', type=int, default=361, help='Seed for the generated payload')
+    parser.add_argument('-o', '--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    args.size = bench.parseSize(args.size)
+    if args.requests < 1 or args.connections < 1 or args.pipeline < 1:
+        print("Error: --requests, --connections and --pipeline must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        elapsed, latencies, failures = asyncio.run(loadTest(args))
+    except OSError as e:
+        print(f"Error: Could not reach the server at {args.connect}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if failures:
+        print(f"{len(failures)} requests failed, first error: {failures[0]}", file=sys.stderr)
+    if not latencies:
+        sys.exit(1)
+
+    latencies.sort()
+    result = {
+        'cipher': args.cipher,
+        'operation': args.op,
+        'size': args.size,
+        'connections': args.connections,
+        'pipeline': args.pipeline,
+        'requests': len(latencies),
+        'failures': len(failures),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed,
+        'MBps': len(latencies) * args.size / elapsed / 1e6,
+    }
+    for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+        result[f'{name}Ms'] = bench.percentile(latencies, fraction) / 1e6
+    result['maxMs'] = latencies[-1] / 1e6
+
+    print(f"{result['requests']} x {bench.formatSize(args.size)} {args.cipher} {args.op} in {elapsed:.2f}s: "
+          f"{result['rps']:.0f} req/s, {result['MBps']:.2f} MB/s")
+    print(f"latency ms: p50 {result['p50Ms']:.2f}  p95 {result['p95Ms']:.2f}  "
+          f"p99 {result['p99Ms']:.2f}  max {result['maxMs']:.2f}")
+    if args.output:
+        bench.writeJson(args.output, result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from csci361.service import protocol
+from csci361.service.server import DEFAULT_KEYS, DEFAULT_PIPELINE_DEPTH, CipherServer, createExecutor
+
+# Runs the cipher service. The key store is a JSON file mapping cipher name -> key id ->
+# parameters, in the shape of DEFAULT_KEYS; clients refer to keys by id only.
+
+DEFAULT_ADDRESS = 'tcp://127.0.0.1:3610'
+
+def readKeyStore(filename):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Key store '{filename}' not found.", file=sys.stderr)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error: Could not read key store '{filename}': {e}", file=sys.stderr)
+    sys.exit(1)
+
+async def serve(args, keyStore):
+    executor = createExecutor(keyStore, args.workers, args.threads)
+    try:
+        server = CipherServer(keyStore, executor, args.pipeline, args.max_frame)
+        listener = await server.start(args.listen)
+        print(f"Listening on {args.listen} ({len(server.registry)} keys)")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Assignment 1 ciphers over a TCP or Unix socket")
+    parser.add_argument('-l', '--listen', default=DEFAULT_ADDRESS,
+                        help=f"tcp://host:port or unix:/path (default {DEFAULT_ADDRESS})")
+    parser.add_argument('-k', '--keys', help='JSON key store (default: the keys used by the Task scripts)')
+    parser.add_argument('--workers', type=int, help='Executor workers for the TEA ciphers (default: CPU count)')
+    parser.add_argument('--threads', action='store_true', help='Use a thread pool instead of worker processes')
+    parser.add_argument('--pipeline', type=int, default=DEFAULT_PIPELINE_DEPTH,
+                        help=f'Requests in flight per connection before reading stops (default {DEFAULT_PIPELINE_DEPTH})')
+    parser.add_argument('--max-frame', type=int, default=protocol.DEFAULT_MAX_FRAME, help='Largest accepted frame in bytes')
+    args = parser.parse_args()
+
+    keyStore = readKeyStore(args.keys) if args.keys else DEFAULT_KEYS
+    try:
+        asyncio.run(serve(args, keyStore))
+    except (ValueError, protocol.ProtocolError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error: Could not listen on {args.listen}: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()